@@ -46,6 +46,13 @@ parser.add_argument(
     help="Randomize the treatment execution order. Per default, treatments are executed in the order given in the "
     "experiment specification",
 )
+parser.add_argument(
+    "--concurrent",
+    action="store_true",
+    help="Run all runtime treatments at the same time instead of one after another. Network treatments on the same "
+    "interface of a service, and all treatments on a paused or killed service, still run one after another. "
+    "Per default, treatments are executed sequentially",
+)
 parser.add_argument(
     "--extend",
     dest="extend",
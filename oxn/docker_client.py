@@ -0,0 +1,24 @@
+"""Docker client shared by treatments and the accountant"""
+import atexit
+import threading
+from typing import Optional
+
+import docker
+
+_DOCKER_CLIENT: Optional[docker.DockerClient] = None
+"""Docker client shared by all callers, created on first use"""
+_DOCKER_CLIENT_LOCK = threading.Lock()
+"""Guards the creation of the shared client, first use can happen from several precondition workers at once"""
+
+
+def docker_client() -> docker.DockerClient:
+    """Return the shared Docker client, connecting to the daemon on first use"""
+    global _DOCKER_CLIENT
+    if _DOCKER_CLIENT is None:
+        with _DOCKER_CLIENT_LOCK:
+            # connecting negotiates the api version over the network, another caller may have won meanwhile
+            if _DOCKER_CLIENT is None:
+                client = docker.from_env(version="auto", timeout=30)
+                atexit.register(client.close)
+                _DOCKER_CLIENT = client
+    return _DOCKER_CLIENT
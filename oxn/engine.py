@@ -3,6 +3,7 @@ import schema
 import yaml
 
 from .runner import ExperimentRunner
+from .treatments import run_preconditions
 from .orchestration import DockerComposeOrchestrator
 from .report import Reporter
 from .store import write_dataframe
@@ -73,6 +74,7 @@ class Engine:
         orchestration_timeout=None,
         randomize=False,
         accounting=False,
+        concurrent=False,
     ):
         """Run an experiment n times"""
 
@@ -95,9 +97,13 @@ class Engine:
                 config_filename=self.config,
                 additional_treatments=self.additional_treatments,
                 random_treatment_order=randomize,
+                concurrent_treatments=concurrent,
                 accountant_names=names,
             )
             self.runner.execute_compile_time_treatments()
+            services_to_build = self.runner.services_to_build
+            if services_to_build:
+                self.orchestrator.build(services_to_build)
             self.orchestrator.orchestrate()
             if not self.orchestrator.ready(timeout=orchestration_timeout):
                 self.runner.clean_compile_time_treatments()
@@ -108,8 +114,9 @@ class Engine:
                 )
             self.sue_running = True
             logger.info("Started sue")
+            preconditions = run_preconditions(self.runner.treatments.values())
             for treatment in self.runner.treatments.values():
-                if not treatment.preconditions():
+                if not preconditions[treatment]:
                     raise OxnException(
                         message=f"Error while checking preconditions for treatment {treatment.name}",
                         explanation="\n".join(treatment.messages),
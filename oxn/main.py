@@ -1,4 +1,5 @@
 import logging
+import signal
 import sys
 
 from .engine import Engine
@@ -10,13 +11,23 @@ from .errors import (
 )
 from .log import initialize_logging
 from .argparser import parse_oxn_args
+from .models.treatment import Treatment
 
 logger = logging.getLogger(__name__)
 
 
+def _handle_sigint(signum, frame):
+    """Let a waiting treatment clean up on the first ctrl-c and force the shutdown on the second"""
+    if Treatment.abort_requested() or not Treatment.is_waiting():
+        raise KeyboardInterrupt
+    logger.info("Aborting running treatments. Press ctrl-c again to force")
+    Treatment.request_abort()
+
+
 def main():
     args = parse_oxn_args(sys.argv[1:])
     initialize_logging(loglevel=args.log_level, logfile=args.log_file)
+    signal.signal(signal.SIGINT, _handle_sigint)
     engine = Engine(
         configuration_path=args.spec,
         report_path=args.report,
@@ -38,6 +49,7 @@ def main():
             runs=args.times,
             orchestration_timeout=args.timeout,
             randomize=args.randomize,
+            concurrent=args.concurrent,
             accounting=args.accounting,
         )
     except OrchestrationException as orc_exception:
@@ -1,7 +1,10 @@
 import abc
+import functools
 import logging
+import threading
 import uuid
 
+from oxn.docker_client import docker_client
 from oxn.errors import OxnException
 from oxn.utils import humanize_utc_timestamp
 
@@ -11,6 +14,11 @@ logger = logging.getLogger(__name__)
 # TODO: think about refactoring validation of params into validator class so it can happen earlier
 
 class Treatment(abc.ABC):
+    _abort = threading.Event()
+    """Shared event that cuts short the waiting period of every running treatment once it is set"""
+    _waiting = 0
+    """Number of treatments currently waiting in _sleep"""
+
     def __init__(self, config, name):
         self.id: str = uuid.uuid4().hex
         """Random machine-readable unique identifier"""
@@ -30,7 +38,8 @@ class Treatment(abc.ABC):
         if not validates:
             raise OxnException(
                 message=f"Invalid configuration for {self.__repr__()} provided.",
-                explanation="\n".join(self.messages),
+                # validators may report the same problem more than once, keep the first occurrence
+                explanation="\n".join(dict.fromkeys(self.messages)),
             )
 
         self._transform_params()
@@ -40,6 +49,62 @@ class Treatment(abc.ABC):
         config_string = [f"{key}={value}, " for key, value in self.config.items()]
         return f"{self.__class__.__name__}(name={self.name}, {''.join(config_string)})"
 
+    @classmethod
+    def request_abort(cls) -> None:
+        """Ask all running treatments to stop waiting so they can be cleaned up"""
+        cls._abort.set()
+
+    @classmethod
+    def abort_requested(cls) -> bool:
+        """Return true if an abort has been requested"""
+        return cls._abort.is_set()
+
+    @classmethod
+    def is_waiting(cls) -> bool:
+        """Return true if a treatment is currently waiting out its duration"""
+        return cls._waiting > 0
+
+    def _sleep(self, seconds: float) -> None:
+        """Wait for the given number of seconds or until an abort is requested, whichever comes first"""
+        Treatment._waiting += 1
+        try:
+            if self._abort.wait(seconds):
+                logger.info(f"Abort requested, cutting the waiting period of {self.name} short")
+        finally:
+            Treatment._waiting -= 1
+
+    @functools.cached_property
+    def client(self):
+        """The Docker client shared by all treatments, created on first use"""
+        return docker_client()
+
+    @property
+    def requires_build(self) -> bool:
+        """
+        Return true if the treatment modifies the build inputs of its service
+
+        The images of services with such a treatment are rebuilt before the sue is started.
+        """
+        return False
+
+    @property
+    def exclusive_resource(self):
+        """
+        Return a hashable key for a resource the treatment takes over as a whole, or None
+
+        Treatments with the same key would overwrite each other, so they are never run at the same time.
+        """
+        return None
+
+    @property
+    def controls_lifecycle(self) -> bool:
+        """
+        Return true if the treatment stops or pauses the container of its service
+
+        Such a treatment conflicts with every other treatment on the same service, not only with those on the same resource.
+        """
+        return False
+
     @property
     def treatment_type(self):
         return self.__class__.__name__
@@ -102,6 +167,25 @@ class Treatment(abc.ABC):
         :return: A dictionary mapping parameter names to parameter types
         """
 
+    def _check_types(self) -> bool:
+        """
+        Check the types of all supplied parameters against the params method in a single pass
+
+        A message is added for each parameter of the wrong type. Parameters that are not supplied
+        are left to the presence checks in the validation of the implementing treatment.
+        """
+        config = self.config
+        mismatches = [
+            (key, expected) for key, expected in self.params().items()
+            if key in config and not isinstance(config[key], expected)
+        ]
+        self.messages.extend(
+            f"Parameter {key} has to be of type "
+            f"{expected.__name__ if isinstance(expected, type) else expected} for {self.treatment_type}"
+            for key, expected in mismatches
+        )
+        return not mismatches
+
     @abc.abstractmethod
     def _validate_params(self) -> bool:
         """
@@ -182,6 +182,25 @@ class DockerComposeOrchestrator:
         containers = self.compose_client.compose.ps()
         return [self.container_service_map[container.name] for container in containers]
 
+    def build(self, names: List[str]):
+        """
+        Rebuild the images of the given services
+
+        Names can be compose service names or container names, container names are translated to service names.
+        """
+        services = [
+            name if name in self.docker_service_names else self.container_service_map.get(name)
+            for name in names
+        ]
+        unknown = [name for name, service in zip(names, services) if service is None]
+        if unknown:
+            raise OrchestrationException(
+                message="Error while building the sue",
+                explanation=f"Cannot build unknown services {unknown}",
+            )
+        logger.info(f"Rebuilding images for {services}")
+        self.compose_client.compose.build(services=services, quiet=True)
+
     def orchestrate(self):
         self.compose_client.compose.up(
             detach=True, services=self.sue_service_names, quiet=True
@@ -5,12 +5,12 @@ import time
 import uuid
 import hashlib
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 import psutil
 
-import docker
-
+from .docker_client import docker_client
 from .errors import OxnException
 from .treatments import (
     EmptyTreatment,
@@ -22,7 +22,8 @@ from .treatments import (
     TailSamplingTreatment,
     KillTreatment,
     MetricsExportIntervalTreatment,
-    ProbabilisticSamplingTreatment
+    ProbabilisticSamplingTreatment,
+    ByteMonkeyTreatment,
 )
 from . import utils
 from .observer import Observer
@@ -56,6 +57,7 @@ class ExperimentRunner:
         "tail": TailSamplingTreatment,
         "probl": ProbabilisticSamplingTreatment,
         "otel_metrics_interval": MetricsExportIntervalTreatment,
+        "bytemonkey": ByteMonkeyTreatment,
     }
 
     def __init__(
@@ -65,6 +67,7 @@ class ExperimentRunner:
             additional_treatments=None,
             random_treatment_order=False,
             accountant_names=None,
+            concurrent_treatments=False,
     ):
         self.config = config
         """Experiment specification dict"""
@@ -80,6 +83,8 @@ class ExperimentRunner:
         """Experiment end as UTC unix timestamp in seconds"""
         self.random_treatment_order = random_treatment_order
         """If the treatments should be executed in random order"""
+        self.concurrent_treatments = concurrent_treatments
+        """If the runtime treatments should be executed at the same time"""
         self.additional_treatments = (
             additional_treatments if additional_treatments else []
         )
@@ -89,7 +94,8 @@ class ExperimentRunner:
         self.accountant = None
         if accountant_names:
             self.accountant = Accountant(
-                client=docker.from_env(),
+                # share the connection pool of the treatments instead of opening one per run
+                client=docker_client(),
                 container_names=accountant_names,
                 process=psutil.Process(),
             )
@@ -175,6 +181,16 @@ class ExperimentRunner:
             if not treatment.is_runtime()
         ]
 
+    @property
+    def services_to_build(self) -> List[str]:
+        """Return the services whose build inputs are modified by a compile time treatment, in spec order"""
+        services = [
+            treatment.config["service_name"]
+            for treatment in self._get_compile_time_treatments()
+            if treatment.requires_build
+        ]
+        return list(dict.fromkeys(services))
+
     def execute_compile_time_treatments(self) -> None:
         """Execute runtime treatments"""
         logger.info("Starting compile time treatments")
@@ -200,13 +216,65 @@ class ExperimentRunner:
         logger.info(f"Sleeping for {ttw_left} seconds")
         time.sleep(ttw_left)
         logger.info(f"Starting runtime treatments")
-        for treatment in self._get_runtime_treatments():
-            treatment.start = utc_timestamp()
-            treatment.inject()
-            treatment.clean()
-            treatment.end = utc_timestamp()
+        treatments = self._get_runtime_treatments()
+        if self.concurrent_treatments and treatments:
+            lanes = self._concurrent_lanes(treatments)
+            # treatments spend most of their time waiting, so one thread per lane is enough
+            with ThreadPoolExecutor(max_workers=len(lanes)) as executor:
+                futures = [executor.submit(self._run_lane, lane) for lane in lanes]
+                for future in futures:
+                    future.result()
+        else:
+            self._run_lane(treatments)
+        if Treatment.abort_requested():
+            # the treatments have been cleaned up, hand over to the regular shutdown path
+            raise KeyboardInterrupt
         logger.info(f"Injected treatments")
 
+    @staticmethod
+    def _concurrent_lanes(treatments: List[Treatment]) -> List[List[Treatment]]:
+        """
+        Group treatments into lanes that can run at the same time
+
+        Treatments that take over the same exclusive resource share a lane and run one after the other
+        in the order of the experiment specification. A treatment that pauses or stops a container
+        shares a lane with every treatment on the same service. Every other treatment gets a lane of its own.
+        """
+        controlled_services = {
+            treatment.config.get("service_name") for treatment in treatments if treatment.controls_lifecycle
+        }
+        lanes = {}
+        for treatment in treatments:
+            service = treatment.config.get("service_name")
+            if service in controlled_services:
+                key = ("service", service)
+            else:
+                key = treatment.exclusive_resource
+            lanes.setdefault(treatment.id if key is None else key, []).append(treatment)
+        for key, lane in lanes.items():
+            if len(lane) > 1:
+                logger.info(
+                    f"Running treatments {[treatment.name for treatment in lane]} one after the other "
+                    f"since they modify the same resource {key}"
+                )
+        return list(lanes.values())
+
+    @classmethod
+    def _run_lane(cls, treatments: List[Treatment]) -> None:
+        """Run treatments one after the other, stopping early if an abort is requested"""
+        for treatment in treatments:
+            cls._run_treatment(treatment)
+            if Treatment.abort_requested():
+                break
+
+    @staticmethod
+    def _run_treatment(treatment: Treatment) -> None:
+        """Inject and clean a single runtime treatment, recording when it started and ended"""
+        treatment.start = utc_timestamp()
+        treatment.inject()
+        treatment.clean()
+        treatment.end = utc_timestamp()
+
     def observe_response_variables(self) -> None:
         self.observer.initialize_variables()
         ttw_right = self.observer.time_to_wait_right()
@@ -1,4 +1,18 @@
 """Library of mocks used by the tests"""
+import copy
+import pathlib
+import pickle
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SpecLoader
+except ImportError:
+    from yaml import SafeLoader as SpecLoader
+
+SPEC_CACHE_PATH = pathlib.Path(__file__).resolve().parents[3] / ".pytest_cache" / "spec_mock.pkl"
+"""On-disk cache of the parsed experiment spec mock, keyed by the mtime of this file"""
+
 
 experiment_spec_mock = """
     experiment:
@@ -40,6 +54,36 @@ experiment_spec_mock = """
             - {name: some_task_name, "endpoint": "/api/cart", "verb": "get", weight: 2, params: {}}
             - {name: some_other_task, "endpoint": "/", "verb": "get", weight: 5, params: {}}
     """
+
+
+def _parse_experiment_spec_mock() -> dict:
+    """Parse the experiment spec mock, reusing the pickled result as long as this file is unchanged"""
+    stamp = pathlib.Path(__file__).stat().st_mtime_ns
+    try:
+        cached_stamp, cached_spec = pickle.loads(SPEC_CACHE_PATH.read_bytes())
+        if cached_stamp == stamp:
+            return cached_spec
+    except (OSError, EOFError, TypeError, ValueError, pickle.UnpicklingError):
+        pass
+    spec = yaml.load(experiment_spec_mock, Loader=SpecLoader)
+    try:
+        SPEC_CACHE_PATH.parent.mkdir(exist_ok=True)
+        SPEC_CACHE_PATH.write_bytes(pickle.dumps((stamp, spec)))
+    except OSError:
+        # a read-only checkout just means we parse on every run
+        pass
+    return spec
+
+
+_loaded_experiment_spec_mock = _parse_experiment_spec_mock()
+"""Experiment spec mock parsed once per test process"""
+
+
+def load_experiment_spec_mock() -> dict:
+    """Return a private copy of the parsed experiment spec mock that tests are free to mutate"""
+    return copy.deepcopy(_loaded_experiment_spec_mock)
+
+
 metric_rvar_description_mock = {
     "some_prometheus_metric": {
         "type": "metric",
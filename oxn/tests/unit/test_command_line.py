@@ -91,6 +91,13 @@ class CommandLineTests(unittest.TestCase):
         parsed = parser.parse_args(test_args)
         self.assertTrue(parsed.randomize)
 
+    @mock.patch("os.path.exists")
+    def test_it_accepts_concurrent(self, mock_exists):
+        mock_exists.return_value = True
+        test_args = [self.experiment_spec_mock, "--concurrent"]
+        parsed = parser.parse_args(test_args)
+        self.assertTrue(parsed.concurrent)
+
     @mock.patch("os.path.exists")
     @mock.patch("argparse.ArgumentParser._print_message", mock.MagicMock)
     def test_it_throws_on_accounting_without_report(self, mock_exists):
@@ -133,6 +140,13 @@ class CommandLineTests(unittest.TestCase):
         parsed = parser.parse_args(test_args)
         self.assertFalse(parsed.randomize)
 
+    @mock.patch("os.path.exists")
+    def test_it_has_default_concurrent(self, mock_exists):
+        mock_exists.return_value = True
+        test_args = [self.experiment_spec_mock]
+        parsed = parser.parse_args(test_args)
+        self.assertFalse(parsed.concurrent)
+
     @mock.patch("os.path.exists")
     def test_it_has_default_times(self, mock_exists):
         mock_exists.return_value = True
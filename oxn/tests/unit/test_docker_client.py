@@ -0,0 +1,28 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from oxn import docker_client as module
+
+
+class DockerClientTest(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.object(module, "_DOCKER_CLIENT", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("oxn.docker_client.atexit.register")
+    @mock.patch("oxn.docker_client.docker.from_env")
+    def test_it_creates_one_client_for_concurrent_first_callers(self, from_env, register):
+        def slow_connect(**_):
+            # negotiating the api version yields to other greenlets
+            time.sleep(0.05)
+            return mock.Mock()
+
+        from_env.side_effect = slow_connect
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: module.docker_client(), range(8)))
+        from_env.assert_called_once()
+        register.assert_called_once()
+        self.assertTrue(all(client is clients[0] for client in clients))
@@ -1,18 +1,16 @@
 import unittest
-import yaml
 
 from locust.shape import LoadTestShape
 from locust.user import User
 
 from oxn.loadgen import LoadGenerator
-from oxn.tests.unit.spec_mocks import experiment_spec_mock
+from oxn.tests.unit.spec_mocks import load_experiment_spec_mock
 
 
 class LoadGenerationTest(unittest.TestCase):
-    spec = yaml.safe_load(experiment_spec_mock)
-
-    def setUp(self) -> None:
-        self.generator = LoadGenerator(config=self.spec)
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.generator = LoadGenerator(config=load_experiment_spec_mock())
 
     def test_it_initializes(self):
         self.assertTrue(self.generator.env)
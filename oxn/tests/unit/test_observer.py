@@ -1,23 +1,21 @@
 import unittest
-import yaml
 
 from oxn.observer import Observer
 from oxn.utils import utc_timestamp
-from oxn.tests.unit.spec_mocks import experiment_spec_mock
+from oxn.tests.unit.spec_mocks import load_experiment_spec_mock
 
 
 class ObserverTest(unittest.TestCase):
-    loaded = yaml.safe_load(experiment_spec_mock)
-
-    def setUp(self) -> None:
-        self.now = utc_timestamp()
-        self.five_min_ago = self.now - 5 * 60
-        self.observer = Observer(
-            config=self.loaded,
-            experiment_start=self.five_min_ago,
-            experiment_end=self.now,
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.now = utc_timestamp()
+        cls.five_min_ago = cls.now - 5 * 60
+        cls.observer = Observer(
+            config=load_experiment_spec_mock(),
+            experiment_start=cls.five_min_ago,
+            experiment_end=cls.now,
         )
-        self.observer.initialize_variables()
+        cls.observer.initialize_variables()
 
     def test_it_builds_response_variables(self):
         self.assertTrue(self.observer.variables())
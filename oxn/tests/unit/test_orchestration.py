@@ -1,19 +1,17 @@
 import unittest
-import yaml
 
 from oxn.orchestration import DockerComposeOrchestrator
-from oxn.tests.unit.spec_mocks import experiment_spec_mock
+from oxn.tests.unit.spec_mocks import load_experiment_spec_mock
 
 
 class OrchestrationTest(unittest.TestCase):
-    spec = experiment_spec_mock
-    loaded_spec = yaml.safe_load(spec)
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.orc = DockerComposeOrchestrator(experiment_config=load_experiment_spec_mock())
 
-    def setUp(self) -> None:
-        self.orc = DockerComposeOrchestrator(experiment_config=self.loaded_spec)
-
-    def tearDown(self) -> None:
-        self.orc.docker_client.close()
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.orc.docker_client.close()
 
     def test_it_reads_the_env_section(self):
         self.assertTrue(self.orc.docker_compose_path)
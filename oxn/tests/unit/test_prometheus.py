@@ -1,4 +1,3 @@
-import time
 import unittest
 
 import requests
@@ -13,6 +12,7 @@ warnings.simplefilter("ignore", ResourceWarning)
 
 
 class PrometheusTests(unittest.TestCase):
+    NOW = 1_700_000_000.0
 
     def setUp(self) -> None:
         self.api = Prometheus()
@@ -21,39 +21,20 @@ class PrometheusTests(unittest.TestCase):
         self.api.session.close()
 
     @patch.object(Session, "get")
-    def test_all_metrics_endpoint(self, mock_get):
+    def test_happy_path_endpoints(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {"data": "mocked_data"}
-        response = self.api.metrics()
-        self.assertTrue(response == {"data": "mocked_data"})
-
-    @patch.object(Session, "get")
-    def test_metadata_endpoint(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = {"data": "mocked_data"}
-        some_metric_metadata = self.api.metric_metadata(metric="")
-        self.assertTrue(some_metric_metadata == {"data": "mocked_data"})
-
-    @patch.object(Session, "get")
-    def test_it_fetches_target_metadata(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = {"data": "mocked_data"}
-        metadata = self.api.target_metadata(match_target="some_target", metric="")
-        self.assertTrue(metadata == {"data": "mocked_data"})
-
-    @patch.object(Session, "get")
-    def test_it_fetches_labels(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = {"data": "mocked_data"}
-        labels = self.api.labels()
-        self.assertTrue(labels == {"data": "mocked_data"})
-
-    @patch.object(Session, "get")
-    def test_it_fetches_exported_job(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = {"data": "mocked_data"}
-        exporter = self.api.label_values(label="server")
-        self.assertTrue(exporter == {"data": "mocked_data"})
+        endpoint_calls = [
+            ("metrics", {}),
+            ("metric_metadata", {"metric": ""}),
+            ("target_metadata", {"match_target": "some_target", "metric": ""}),
+            ("labels", {}),
+            ("label_values", {"label": "server"}),
+        ]
+        for method, kwargs in endpoint_calls:
+            with self.subTest(method=method):
+                response = getattr(self.api, method)(**kwargs)
+                self.assertTrue(response == {"data": "mocked_data"})
 
     @patch.object(Session, "get")
     def test_it_throws_on_http_error_code(self, mock_get):
@@ -65,11 +46,9 @@ class PrometheusTests(unittest.TestCase):
     def test_it_performs_range_queries(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {"data": "mock_data"}
-        now = time.time()
-        a_minute_ago = now - 1 * 60
         metric_name = "otelcol_exporter_sent_spans"
         query = self.api.build_query(metric_name=metric_name)
         result = self.api.range_query(
-            query=query, start=a_minute_ago, end=now, step="5s"
+            query=query, start=self.NOW - 60, end=self.NOW, step="5s"
         )
         self.assertTrue(result == {"data": "mock_data"})
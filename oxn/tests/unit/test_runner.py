@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+from collections import Counter
+from unittest import mock
+
+from oxn.models.treatment import Treatment
+from oxn.runner import ExperimentRunner
+from oxn.tests.unit.spec_mocks import load_experiment_spec_mock
+
+
+class ConcurrentTreatmentsTest(unittest.TestCase):
+    treatments = [
+        {"frontend_delay": {"action": "delay", "params": {
+            "service_name": "frontend", "interface": "eth0", "duration": "1s", "delay_time": "90ms"}}},
+        {"frontend_loss": {"action": "loss", "params": {
+            "service_name": "frontend", "interface": "eth0", "duration": "1s", "loss_percentage": "15%"}}},
+        {"cart_delay": {"action": "delay", "params": {
+            "service_name": "cartservice", "interface": "eth0", "duration": "1s", "delay_time": "90ms"}}},
+        {"frontend_pause": {"action": "pause", "params": {"service_name": "frontend", "duration": "1s"}}},
+    ]
+
+    def setUp(self) -> None:
+        Treatment._abort.clear()
+        spec = load_experiment_spec_mock()
+        spec["experiment"]["treatments"] = self.treatments
+        self.runner = ExperimentRunner(config=spec, concurrent_treatments=True)
+
+    def test_it_gives_treatments_on_a_paused_service_one_lane(self):
+        lanes = self.runner._concurrent_lanes(list(self.runner.treatments.values()))
+        names = sorted([treatment.name for treatment in lane] for lane in lanes)
+        self.assertTrue(names == [["cart_delay"], ["frontend_delay", "frontend_loss", "frontend_pause"]])
+
+    def test_it_keeps_network_treatments_of_other_interfaces_apart(self):
+        treatments = [
+            treatment for treatment in self.runner.treatments.values() if treatment.name != "frontend_pause"
+        ]
+        lanes = self.runner._concurrent_lanes(treatments)
+        names = sorted([treatment.name for treatment in lane] for lane in lanes)
+        self.assertTrue(names == [["cart_delay"], ["frontend_delay", "frontend_loss"]])
+
+    def test_it_never_overlaps_treatments_on_a_paused_service(self):
+        lock = threading.Lock()
+        active = Counter()
+        most_active = Counter()
+
+        def run(treatment):
+            key = treatment.config["service_name"]
+            with lock:
+                active[key] += 1
+                most_active[key] = max(most_active[key], active[key])
+                most_active["all"] = max(most_active["all"], sum(active.values()))
+            time.sleep(0.1)
+            with lock:
+                active[key] -= 1
+
+        with mock.patch.object(self.runner.observer, "time_to_wait_left", return_value=0), \
+                mock.patch.object(ExperimentRunner, "_run_treatment", side_effect=run) as run_treatment:
+            self.runner.execute_runtime_treatments()
+        self.assertTrue(run_treatment.call_count == len(self.treatments))
+        self.assertTrue(most_active["frontend"] == 1)
+        self.assertTrue(most_active["all"] == 2)
+
+
+class ServicesToBuildTest(unittest.TestCase):
+    @staticmethod
+    def treatment(service_name, runtime=False, requires_build=False):
+        treatment = mock.Mock(spec=Treatment, config={"service_name": service_name}, requires_build=requires_build)
+        treatment.is_runtime.return_value = runtime
+        return treatment
+
+    def test_it_only_builds_services_with_modified_build_inputs(self):
+        spec = load_experiment_spec_mock()
+        spec["experiment"]["treatments"] = []
+        runner = ExperimentRunner(config=spec)
+        runner.treatments = {
+            "metrics_interval": self.treatment("frontend"),
+            "bytemonkey": self.treatment("ad-service", requires_build=True),
+            "second_bytemonkey": self.treatment("ad-service", requires_build=True),
+            "runtime_treatment": self.treatment("cart-service", runtime=True, requires_build=True),
+        }
+        self.assertTrue(runner.services_to_build == ["ad-service"])
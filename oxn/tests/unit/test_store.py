@@ -5,16 +5,17 @@ from oxn.store import Trie, get_dataframe, consolidate_runs
 
 
 class StoreTest(unittest.TestCase):
-    def setUp(self) -> None:
-        self.trie = Trie(disk_name=None)
-        self.entries = [
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.trie = Trie(disk_name=None)
+        cls.entries = [
             "experiments/6ce2f6b0/a33e8e5b/otelcol_exporter_sent_spans",
             "experiments/6ce2f6b0/a31e8e5b/otelcol_exporter_some_other_metric",
             "experiments/6ce2f6b0/a35e8e5b/otelcol_exporter_sent_spans",
             "experiments/6ce2f6b0/f35e8e5b/otelcol_exporter_sent_spans",
         ]
-        for entry in self.entries:
-            self.trie.insert(entry)
+        for entry in cls.entries:
+            cls.trie.insert(entry)
 
     def test_it_searches_by_experiment(self):
         prefix = self.entries[0][:11]
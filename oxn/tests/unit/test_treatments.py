@@ -1,3 +1,6 @@
+import os
+import tempfile
+import time
 import unittest
 from io import StringIO
 from unittest import mock
@@ -8,8 +11,30 @@ from oxn.treatments import (
     PrometheusIntervalTreatment,
     TailSamplingTreatment,
     StressTreatment,
+    ByteMonkeyTreatment,
+    NetworkDelayTreatment,
+    EmptyTreatment,
+    PauseTreatment,
+    ProbabilisticSamplingTreatment,
+    CorruptPacketTreatment,
+    KillTreatment,
+    PacketLossTreatment,
+    MetricsExportIntervalTreatment,
+    run_preconditions,
+    _has_tc,
+    _has_stress_ng,
+    _get_container,
+    invalidate_capability_cache,
+    _load_yaml,
+    _atomic_write,
+    _write_in_place,
+    _add_trace_processor,
+    _apply_netem,
+    _release_netem,
+    _NETEM_USERS,
 )
 from oxn.errors import OxnException
+from oxn.models.treatment import Treatment
 
 
 class PrometheusScrapeTest(unittest.TestCase):
@@ -75,6 +100,20 @@ class PrometheusScrapeTest(unittest.TestCase):
         )
         self.assertTrue(treatment.clean.defer_cleanup)
 
+    @patch("oxn.treatments._PROM_SESSION.post")
+    @patch("os.path.isfile")
+    @patch("builtins.open")
+    def test_it_skips_clean_when_the_interval_is_unchanged(self, mock_open, mock_isfile, mock_post):
+        mock_isfile.return_value = True
+        mock_open.return_value = StringIO(self.mock_prometheus_config)
+        treatment = PrometheusIntervalTreatment(
+            config=self.valid_config, name="prometheus_treatment"
+        )
+        mock_open.reset_mock()
+        treatment.clean()
+        mock_open.assert_not_called()
+        mock_post.assert_not_called()
+
 
 class TailSamplingTreatmentTest(unittest.TestCase):
     valid_config = {
@@ -145,3 +184,419 @@ class StressTreatmentTest(unittest.TestCase):
             "30s",
         ]
         self.assertTrue(t._build_command() == expected)
+
+
+class ByteMonkeyTreatmentTest(unittest.TestCase):
+    dockerfile = 'FROM eclipse-temurin:17\nCOPY app.jar ./\nENTRYPOINT ["java", "-jar", "app.jar"]'
+
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(prefix="Dockerfile")
+        with os.fdopen(fd, "w") as fp:
+            fp.write(self.dockerfile)
+        self.context = tempfile.mkdtemp()
+        self.config = {
+            "mode": "fault", "rate": 0.5, "dockerfile": self.path, "service_name": "ad-service", "context": self.context
+        }
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+        os.rmdir(self.context)
+
+    def test_it_reports_missing_and_invalid_params(self):
+        config = {"mode": "chaos", "rate": 1.5, "service_name": "ad-service", "context": "not-a-directory"}
+        with self.assertRaises(OxnException) as context:
+            ByteMonkeyTreatment(config=config, name="test_bytemonkey")
+        explanation = context.exception.explanation
+        for key in ("dockerfile", "mode", "rate", "context"):
+            with self.subTest(key=key):
+                self.assertTrue(f"Parameter {key} has to" in explanation)
+
+    @mock.patch("oxn.models.treatment.docker_client")
+    def test_it_reads_the_dockerfile_on_construction(self, _):
+        treatment = ByteMonkeyTreatment(config=self.config, name="test_bytemonkey")
+        self.assertTrue(treatment.dockerfile_content == self.dockerfile)
+
+    @mock.patch("oxn.models.treatment.docker_client")
+    def test_it_modifies_and_restores_the_entrypoint(self, _):
+        treatment = ByteMonkeyTreatment(config=self.config, name="test_bytemonkey")
+        modified = treatment.modify_dockerfile().splitlines()
+        self.assertTrue(modified[2] == "COPY byte-monkey.jar ./")
+        self.assertTrue(
+            modified[3] == 'ENV JAVA_TOOL_OPTIONS="${JAVA_TOOL_OPTIONS} -javaagent:byte-monkey.jar=mode:fault,rate:0.5,"'
+        )
+        self.assertTrue(modified[4] == 'ENTRYPOINT ["java", "-jar", "app.jar"]')
+        self.assertTrue(treatment.restore_entrypoint() == self.dockerfile)
+
+    @mock.patch("oxn.models.treatment.docker_client")
+    def test_it_keeps_trailing_content(self, _):
+        with open(self.path, "w") as fp:
+            fp.write(self.dockerfile + "\nEXPOSE 8080\n")
+        treatment = ByteMonkeyTreatment(config=self.config, name="test_bytemonkey")
+        self.assertTrue(treatment.modify_dockerfile().endswith('ENTRYPOINT ["java", "-jar", "app.jar"]\nEXPOSE 8080\n'))
+        self.assertTrue(treatment.original_entrypoint == 'ENTRYPOINT ["java", "-jar", "app.jar"]')
+
+    @mock.patch("oxn.models.treatment.docker_client")
+    def test_it_places_the_agent_in_the_build_context(self, docker_mock):
+        context = self.context
+        fd, cached_jar = tempfile.mkstemp(suffix=".jar")
+        os.close(fd)
+        self.addCleanup(os.remove, cached_jar)
+        treatment = ByteMonkeyTreatment(config=self.config, name="test_bytemonkey")
+        with mock.patch("oxn.treatments.BYTE_MONKEY_JAR_CACHE", cached_jar):
+            treatment.inject()
+        self.assertTrue(os.path.isfile(os.path.join(context, "byte-monkey.jar")))
+        with open(self.path) as fp:
+            self.assertTrue("COPY byte-monkey.jar ./" in fp.read())
+        docker_mock.return_value.images.build.assert_not_called()
+        treatment.clean()
+        self.assertFalse(os.path.exists(os.path.join(context, "byte-monkey.jar")))
+        with open(self.path) as fp:
+            self.assertTrue(fp.read() == self.dockerfile)
+
+
+class NetworkDelayTreatmentTest(unittest.TestCase):
+    valid_config = {
+        "service_name": "recommendation-service",
+        "interface": "eth0",
+        "duration": "1m",
+        "delay_time": "90ms",
+        "delay_correlation": "25%",
+    }
+
+    def test_it_rejects_unanchored_correlation(self):
+        config = self.valid_config | {"delay_correlation": "abc25%"}
+        with self.assertRaises(OxnException) as context:
+            NetworkDelayTreatment(config=config, name="test_delay")
+        self.assertTrue("delay_correlation" in context.exception.explanation)
+
+
+class RunPreconditionsTest(unittest.TestCase):
+    def test_it_maps_every_treatment_to_its_result(self):
+        first = EmptyTreatment(config={"duration": "1s"}, name="first")
+        second = EmptyTreatment(config={"duration": "1s"}, name="second")
+        with patch.object(second, "preconditions", return_value=False):
+            results = run_preconditions([first, second])
+        self.assertTrue(results == {first: True, second: False})
+
+    def test_it_handles_no_treatments(self):
+        self.assertTrue(run_preconditions([]) == {})
+
+
+class AbortTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        Treatment._abort.clear()
+
+    def test_it_cuts_the_duration_short_after_an_abort(self):
+        treatment = EmptyTreatment(config={"duration": "1m"}, name="test_empty")
+        Treatment.request_abort()
+        started = time.monotonic()
+        treatment.inject()
+        self.assertTrue(time.monotonic() - started < 1)
+        self.assertFalse(Treatment.is_waiting())
+
+
+class CapabilityCacheTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        invalidate_capability_cache()
+
+    def test_it_probes_each_container_once(self):
+        container = mock.Mock()
+        container.id = "some-container-id"
+        container.exec_run.return_value = (0, b"tc utility")
+        self.assertTrue(_has_tc(container))
+        self.assertTrue(_has_tc(container))
+        container.exec_run.assert_called_once()
+
+    def test_it_probes_again_after_invalidation(self):
+        container = mock.Mock()
+        container.id = "some-container-id"
+        container.exec_run.return_value = (127, b"")
+        self.assertFalse(_has_tc(container))
+        invalidate_capability_cache(container.id)
+        self.assertFalse(_has_tc(container))
+        self.assertTrue(container.exec_run.call_count == 2)
+
+    def test_it_caches_each_binary_separately(self):
+        container = mock.Mock()
+        container.id = "some-container-id"
+        container.exec_run.return_value = (0, b"")
+        self.assertTrue(_has_tc(container))
+        self.assertTrue(_has_stress_ng(container))
+        self.assertTrue(_has_stress_ng(container))
+        self.assertTrue(container.exec_run.call_count == 2)
+
+
+class ContainerLookupTest(unittest.TestCase):
+    @mock.patch("oxn.models.treatment.docker_client")
+    def test_it_looks_up_the_container_once_per_treatment(self, docker_client):
+        treatment = KillTreatment(config={"service_name": "frontend", "duration": "1s"}, name="test_kill")
+        container = docker_client.return_value.containers.get.return_value
+        self.assertTrue(_get_container(treatment) is container)
+        self.assertTrue(_get_container(treatment, reload=True) is container)
+        docker_client.return_value.containers.get.assert_called_once_with(container_id="frontend")
+        container.reload.assert_called_once()
+
+
+class YamlCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".yaml")
+        with os.fdopen(fd, "w") as fp:
+            fp.write("processors: {batch: {}}\n")
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    def test_it_returns_independent_copies(self):
+        first = _load_yaml(self.path)
+        first["processors"]["mutated"] = True
+        second = _load_yaml(self.path)
+        self.assertTrue(second == {"processors": {"batch": {}}})
+
+    def test_it_reloads_changed_files(self):
+        _load_yaml(self.path)
+        with open(self.path, "w") as fp:
+            fp.write("receivers: {otlp: {protocols: {grpc: {}}}}\n")
+        self.assertTrue("receivers" in _load_yaml(self.path))
+
+    def test_it_loads_empty_files_as_dict(self):
+        with open(self.path, "w"):
+            pass
+        self.assertTrue(_load_yaml(self.path) == {})
+
+
+class AtomicWriteTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "docker-compose.yml")
+        with open(self.path, "w") as fp:
+            fp.write("services: {}\n")
+
+    def tearDown(self) -> None:
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_it_replaces_the_contents(self):
+        _atomic_write(self.path, b"version: '3'\n", mode="wb")
+        with open(self.path, "rb") as fp:
+            self.assertTrue(fp.read() == b"version: '3'\n")
+        self.assertTrue(os.listdir(self.directory) == ["docker-compose.yml"])
+
+    def test_it_keeps_the_original_on_failure(self):
+        with self.assertRaises(TypeError):
+            _atomic_write(self.path, b"not text")
+        with open(self.path, "r") as fp:
+            self.assertTrue(fp.read() == "services: {}\n")
+        self.assertTrue(os.listdir(self.directory) == ["docker-compose.yml"])
+
+    def test_it_keeps_the_mode_and_symlinks(self):
+        os.chmod(self.path, 0o640)
+        link = os.path.join(self.directory, "linked-compose.yml")
+        os.symlink(self.path, link)
+        _atomic_write(link, "version: '3'\n")
+        self.assertTrue(os.path.islink(link))
+        self.assertTrue(os.stat(self.path).st_mode & 0o777 == 0o640)
+        with open(self.path, "r") as fp:
+            self.assertTrue(fp.read() == "version: '3'\n")
+
+
+class WriteInPlaceTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "otelcol-config-extras.yml")
+        with open(self.path, "w") as fp:
+            fp.write("processors: {}\n")
+
+    def tearDown(self) -> None:
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_it_replaces_the_contents(self):
+        _write_in_place(self.path, b"receivers: {}\n", mode="wb")
+        with open(self.path, "rb") as fp:
+            self.assertTrue(fp.read() == b"receivers: {}\n")
+        self.assertTrue(os.listdir(self.directory) == ["otelcol-config-extras.yml"])
+
+    def test_it_keeps_the_inode_and_mode(self):
+        os.chmod(self.path, 0o640)
+        before = os.stat(self.path)
+        _write_in_place(self.path, "receivers: {}\n")
+        after = os.stat(self.path)
+        self.assertTrue(after.st_ino == before.st_ino)
+        self.assertTrue(after.st_mode == before.st_mode)
+
+    def test_it_writes_through_symlinks(self):
+        link = os.path.join(self.directory, "linked-extras.yml")
+        os.symlink(self.path, link)
+        _write_in_place(link, "receivers: {}\n")
+        self.assertTrue(os.path.islink(link))
+        with open(self.path, "r") as fp:
+            self.assertTrue(fp.read() == "receivers: {}\n")
+
+
+class SnapshotRestoreTest(unittest.TestCase):
+    original = b"# collector extras\nprocessors:\n  batch: {}\n"
+
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".yaml")
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(self.original)
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    @mock.patch("oxn.models.treatment.docker_client")
+    def test_clean_restores_the_original_bytes(self, _):
+        config = {"otelcol_extras": self.path, "percentage": 50, "seed": 1}
+        treatment = ProbabilisticSamplingTreatment(config=config, name="test_probl")
+        treatment.inject()
+        with open(self.path, "rb") as fp:
+            self.assertTrue(b"probabilistic_sampler" in fp.read())
+        treatment.clean()
+        with open(self.path, "rb") as fp:
+            self.assertTrue(fp.read() == self.original)
+
+
+class TraceProcessorTest(unittest.TestCase):
+    extras = {
+        "exporters": {"logging": {}},
+        "processors": {"batch": {}},
+    }
+
+    def test_it_preserves_existing_config(self):
+        updated = _add_trace_processor(
+            extras=self.extras, name="probabilistic_sampler", processor={"sampling_percentage": 50}
+        )
+        self.assertTrue(updated["exporters"] == {"logging": {}})
+        self.assertTrue("batch" in updated["processors"])
+        self.assertTrue(updated["processors"]["probabilistic_sampler"] == {"sampling_percentage": 50})
+        self.assertTrue(updated["service"]["pipelines"]["traces"]["processors"] == ["probabilistic_sampler"])
+
+    def test_it_does_not_mutate_the_original(self):
+        _add_trace_processor(extras=self.extras, name="tail_sampling", processor={"policies": []})
+        self.assertTrue(self.extras == {"exporters": {"logging": {}}, "processors": {"batch": {}}})
+
+
+class ValidatorBugfixTest(unittest.TestCase):
+    def test_pause_rejects_invalid_duration(self):
+        with self.assertRaises(OxnException) as context:
+            PauseTreatment(config={"service_name": "frontend", "duration": "soon"}, name="test_pause")
+        self.assertTrue("duration" in context.exception.explanation)
+
+    def test_probabilistic_sampling_rejects_out_of_range_percentage(self):
+        config = {"otelcol_extras": "mock-otelcol-extras.yaml", "percentage": 150, "seed": 1}
+        with self.assertRaises(OxnException) as context:
+            ProbabilisticSamplingTreatment(config=config, name="test_probl")
+        self.assertTrue("percentage" in context.exception.explanation)
+
+    def test_packet_loss_reports_missing_keys(self):
+        config = {"service_name": "frontend", "duration": "1m", "interface": "eth0"}
+        with self.assertRaises(OxnException) as context:
+            PacketLossTreatment(config=config, name="test_loss")
+        self.assertTrue("loss_percentage" in context.exception.explanation)
+
+    def test_metrics_export_interval_reports_missing_keys(self):
+        config = {"service_name": "frontend", "compose_file": "docker-compose.yml"}
+        with self.assertRaises(OxnException) as context:
+            MetricsExportIntervalTreatment(config=config, name="test_interval")
+        self.assertTrue("interval" in context.exception.explanation)
+
+    def test_prometheus_interval_rejects_non_string_config_path(self):
+        with self.assertRaises(OxnException) as context:
+            PrometheusIntervalTreatment(config={"prometheus_config": 1, "interval": "1s"}, name="test_prometheus")
+        self.assertTrue("prometheus_config" in context.exception.explanation)
+
+    def test_delay_rejects_unknown_distribution(self):
+        config = NetworkDelayTreatmentTest.valid_config | {"delay_distribution": "gaussian"}
+        with self.assertRaises(OxnException) as context:
+            NetworkDelayTreatment(config=config, name="test_delay")
+        self.assertTrue(
+            context.exception.explanation
+            == "Parameter delay_distribution has to be one of "
+               "['normal', 'pareto', 'paretonormal', 'uniform'] for NetworkDelayTreatment"
+        )
+
+
+class ValidatorTypeCheckTest(unittest.TestCase):
+    def test_corrupt_rejects_non_string_percentage(self):
+        config = {
+            "service_name": "frontend",
+            "interface": "eth0",
+            "duration": "1m",
+            "corrupt_percentage": 15,
+        }
+        with self.assertRaises(OxnException) as context:
+            CorruptPacketTreatment(config=config, name="test_corrupt")
+        self.assertTrue("corrupt_percentage" in context.exception.explanation)
+
+    def test_kill_rejects_non_string_duration(self):
+        with self.assertRaises(OxnException) as context:
+            KillTreatment(config={"service_name": "frontend", "duration": 30}, name="test_kill")
+        self.assertTrue("duration" in context.exception.explanation)
+
+
+class NetemQdiscTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.container = mock.Mock()
+        self.container.id = "some-container-id"
+        self.container.exec_run.return_value = (0, b"")
+
+    def tearDown(self) -> None:
+        _NETEM_USERS.clear()
+
+    def commands(self):
+        return [c.kwargs["cmd"] for c in self.container.exec_run.call_args_list]
+
+    def test_it_changes_or_adds_in_a_single_exec(self):
+        _apply_netem(self.container, "eth0", ["delay", "90ms", "0ms", "0%"])
+        self.assertTrue(self.container.exec_run.call_count == 1)
+        shell, flag, script = self.commands()[0]
+        self.assertTrue([shell, flag] == ["sh", "-c"])
+        self.assertTrue(script.startswith("tc qdisc change dev eth0 root netem delay 90ms"))
+        self.assertTrue("|| tc qdisc add dev eth0 root netem delay 90ms" in script)
+
+    def test_it_runs_the_prelude_in_the_same_exec(self):
+        _apply_netem(self.container, "eth0", ["loss", "random", "15%"], prelude=[["tc", "-Version"]])
+        self.assertTrue(self.container.exec_run.call_count == 1)
+        _, _, script = self.commands()[0]
+        self.assertTrue(script.startswith("{ tc -Version; } && { tc qdisc change dev eth0 root netem loss"))
+
+    def test_it_quotes_parameters(self):
+        _apply_netem(self.container, "eth0; reboot", ["loss", "random", "15%"])
+        _, _, script = self.commands()[0]
+        self.assertTrue("'eth0; reboot'" in script)
+
+    def test_it_deletes_only_after_the_last_release(self):
+        _apply_netem(self.container, "eth0", ["loss", "random", "15%"])
+        _apply_netem(self.container, "eth0", ["delay", "90ms", "0ms", "0%"])
+        _release_netem(self.container, "eth0")
+        self.assertTrue(self.container.exec_run.call_count == 2)
+        _release_netem(self.container, "eth0")
+        self.assertTrue(self.commands()[-1][:3] == ["tc", "qdisc", "del"])
+
+    @mock.patch.object(Treatment, "_sleep")
+    def test_it_keeps_the_qdisc_when_a_failed_treatment_is_cleaned(self, _):
+        config = {"service_name": "frontend", "interface": "eth0", "duration": "1s"}
+        delay = NetworkDelayTreatment(config=config | {"delay_time": "90ms"}, name="delay")
+        loss = PacketLossTreatment(config=config | {"loss_percentage": "15%"}, name="loss")
+        for treatment in (delay, loss):
+            treatment.__dict__["_containers"] = {"frontend": self.container}
+        delay.inject()
+        self.container.exec_run.return_value = (1, b"RTNETLINK answers: Operation not permitted")
+        loss.inject()
+        loss.clean()
+        self.assertFalse(any(command[:3] == ["tc", "qdisc", "del"] for command in self.commands()))
+        self.container.exec_run.return_value = (0, b"")
+        delay.clean()
+        self.assertTrue(self.commands()[-1][:3] == ["tc", "qdisc", "del"])
+
+    def test_packet_loss_does_not_wait_after_a_failed_injection(self):
+        config = {"service_name": "frontend", "interface": "eth0", "duration": "1s", "loss_percentage": "15%"}
+        loss = PacketLossTreatment(config=config, name="loss")
+        loss.__dict__["_containers"] = {"frontend": self.container}
+        self.container.exec_run.return_value = (1, b"sh: tc: not found")
+        with mock.patch.object(Treatment, "_sleep") as sleep:
+            loss.inject()
+        sleep.assert_not_called()
+        self.assertFalse(loss.netem_acquired)
@@ -1,9 +1,17 @@
+import os
+import re
+import tempfile
 import unittest
 from datetime import datetime
 
-from oxn.utils import time_string_to_seconds, defer_cleanup
+import yaml
+
+from oxn.utils import time_string_to_seconds
+from oxn.utils import validate_time_string, time_string_format_regex, SECONDS_MAP
 from oxn.utils import to_microseconds, to_milliseconds
 from oxn.utils import utc_timestamp, humanize_utc_timestamp
+from oxn.utils import add_env_variable, remove_env_variable
+from oxn.errors import OxnException
 
 
 class UtilsTest(unittest.TestCase):
@@ -42,8 +50,86 @@ class UtilsTest(unittest.TestCase):
         self.assertTrue(isinstance(humanized, datetime))
 
     def test_it_sets_deferred_cleanup_attr(self):
+        from oxn.utils import defer_cleanup
+
         @defer_cleanup
         def func():
             pass
 
         self.assertTrue(func.defer_cleanup)
+
+
+class TimeStringTest(unittest.TestCase):
+    @staticmethod
+    def reference_seconds(time_string):
+        """Sum up all matches of the time string format regex, the scanner has to agree with this"""
+        return sum(float(value) * SECONDS_MAP[unit] for value, unit in re.findall(time_string_format_regex, time_string))
+
+    def test_it_accepts_valid_time_strings(self):
+        for time_string in ["1s", "90ms", "5us", "2h", "1d", "10m30s", "0m"]:
+            with self.subTest(time_string=time_string):
+                self.assertTrue(validate_time_string(time_string))
+
+    def test_it_rejects_invalid_time_strings(self):
+        for time_string in ["", "abc", "m10", "10x", "ms"]:
+            with self.subTest(time_string=time_string):
+                self.assertFalse(validate_time_string(time_string))
+
+    def test_it_converts_units(self):
+        cases = {"5us": 5 / 10 ** 6, "90ms": 0.09, "2h": 7200, "1d": 86400, "1h30m15s": 5415}
+        for time_string, seconds in cases.items():
+            with self.subTest(time_string=time_string):
+                self.assertAlmostEqual(time_string_to_seconds(time_string), seconds)
+
+    def test_it_agrees_with_the_format_regex(self):
+        for time_string in ["10mabc5s", "1.5s", "5ms3us", "x", "12", "3mm", "7uss", "1u2s", "", "4 m 2 s"]:
+            with self.subTest(time_string=time_string):
+                self.assertTrue(time_string_to_seconds(time_string) == self.reference_seconds(time_string))
+
+    def test_it_memoizes_parsed_time_strings(self):
+        for function in (validate_time_string, time_string_to_seconds):
+            with self.subTest(function=function.__name__):
+                function.cache_clear()
+                first, second = function("42m"), function("42m")
+                self.assertTrue(first == second)
+                self.assertTrue(function.cache_info().hits == 1)
+                self.assertTrue(function.cache_info().misses == 1)
+
+
+class EnvVariableTest(unittest.TestCase):
+    compose = {
+        "services": {
+            "frontend": {"environment": ["OTEL_SERVICE_NAME=frontend", "PASSTHROUGH", "PORT=8080"]},
+        }
+    }
+
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".yml")
+        with os.fdopen(fd, "w") as fp:
+            yaml.safe_dump(self.compose, fp)
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    def environment(self):
+        with open(self.path, "r") as fp:
+            return yaml.safe_load(fp)["services"]["frontend"]["environment"]
+
+    def test_it_replaces_an_existing_variable(self):
+        add_env_variable(self.path, "frontend", "PORT", "9090")
+        self.assertTrue(self.environment() == ["OTEL_SERVICE_NAME=frontend", "PASSTHROUGH", "PORT=9090"])
+
+    def test_it_appends_a_new_variable(self):
+        add_env_variable(self.path, "frontend", "OTEL_METRIC_EXPORT_INTERVAL", "1000")
+        self.assertTrue(self.environment()[-1] == "OTEL_METRIC_EXPORT_INTERVAL=1000")
+
+    def test_it_removes_a_variable_by_name(self):
+        remove_env_variable(self.path, "frontend", "OTEL_SERVICE_NAME", "frontend")
+        self.assertTrue(self.environment() == ["PASSTHROUGH", "PORT=8080"])
+
+    def test_it_rejects_a_mapping_environment_on_removal(self):
+        with open(self.path, "w") as fp:
+            yaml.safe_dump({"services": {"frontend": {"environment": {"PORT": "8080"}}}}, fp)
+        with self.assertRaises(OxnException):
+            remove_env_variable(self.path, "frontend", "PORT")
+        self.assertTrue(self.environment() == {"PORT": "8080"})
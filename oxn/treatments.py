@@ -1,17 +1,27 @@
 """Treatment implementations"""
+import copy
+import itertools
 import logging
 import os.path
-import tempfile
 import time
 import re
-from typing import Optional
+import shlex
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import ClassVar, Optional, Iterable
 
-import docker
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
 from docker.errors import NotFound as ContainerNotFound
 from docker.errors import APIError as DockerAPIError
 
+try:
+    from yaml import CSafeLoader as _YLoader, CSafeDumper as _YDumper
+except ImportError:
+    from yaml import SafeLoader as _YLoader, SafeDumper as _YDumper
+
 from python_on_whales import DockerClient
 
 from oxn.utils import (
@@ -24,6 +34,252 @@ from oxn.models.treatment import Treatment
 
 logger = logging.getLogger(__name__)
 
+_PCT_STRICT_RE = re.compile(r"^(?:[1-9][0-9]?|100)%$")
+"""Percentages in the range [1%, 100%]"""
+_PCT_LOOSE_RE = re.compile(r"^\d+%$")
+"""Any non-negative integer percentage"""
+_ENTRYPOINT_RE = re.compile(r"(?m)^ENTRYPOINT.*$")
+"""The entrypoint instruction of a Dockerfile"""
+_PROM_INTERVAL_RE = re.compile(
+    r"((([0-9]+)y)?(([0-9]+)w)?(([0-9]+)d)?(([0-9]+)h)?(([0-9]+)m)?((["
+    r"0-9]+)s)?(([0-9]+)ms)?|0)"
+)
+"""Prometheus duration format, cf. https://prometheus.io/docs/prometheus/latest/configuration/configuration/"""
+
+_MSG_MISSING = "Parameter {key} has to be supplied for {t}"
+"""Validation message for a required parameter that is not supplied"""
+_MSG_NO_MATCH = "Parameter {key} has to match {pattern} for {t}"
+"""Validation message for a parameter value that does not match the expected format"""
+_MSG_OUT_OF_RANGE = "Parameter {key} has to be in the range {range} for {t}"
+"""Validation message for a numeric parameter value outside of its allowed range"""
+_MSG_NOT_ONE_OF = "Parameter {key} has to be one of {choices} for {t}"
+"""Validation message for a parameter value that is not one of the allowed choices"""
+_MSG_EMPTY = "Parameter {key} has to have at least one entry for {t}"
+"""Validation message for a collection parameter without entries"""
+_MSG_NOT_FOUND = "Parameter {key} has to point to an existing {kind} for {t}"
+"""Validation message for a path parameter that does not point to an existing file or directory"""
+
+BYTE_MONKEY_JAR_CACHE = os.path.expanduser("~/.cache/oxn/byte-monkey-1.0.0.jar")
+"""Location of the cached byte-monkey agent so it is only downloaded once"""
+BYTE_MONKEY_JAR_NAME = "byte-monkey.jar"
+"""Name of the byte-monkey agent in the build context, as referenced by the javaagent option"""
+BYTE_MONKEY_MODES = ("fault", "latency", "nullify", "scb")
+"""Fault injection modes supported by the byte-monkey agent"""
+
+_PROM_SESSION = requests.Session()
+"""Session for the prometheus reload endpoint, keeps the connection alive across reloads"""
+_PROM_SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+_CAPABILITY_CACHE: dict[tuple[str, str], bool] = {}
+"""Map container ids and binaries to whether the binary is installed in the container"""
+
+
+def _get_container(treatment: Treatment, service: Optional[str] = None, reload: bool = False):
+    """
+    Return the container a treatment acts on, looking it up via the Docker API only once per treatment instance
+
+    The returned container caches its attributes, pass reload to refresh a previously looked up container
+    when its status matters.
+    """
+    if service is None:
+        service = treatment.config["service_name"]
+    containers = treatment.__dict__.setdefault("_containers", {})
+    container = containers.get(service)
+    if container is None:
+        container = treatment.client.containers.get(container_id=service)
+        containers[service] = container
+    elif reload:
+        container.reload()
+    return container
+
+
+def _cached_probe(container, binary: str) -> Optional[bool]:
+    """Return whether a binary was found in a container, or None if the container was not probed for it yet"""
+    return _CAPABILITY_CACHE.get((container.id, binary))
+
+
+def _record_probe(container, binary: str, installed: bool) -> None:
+    """Remember whether a binary is installed in a container"""
+    _CAPABILITY_CACHE[(container.id, binary)] = installed
+
+
+def _has_binary(container, binary: str, probe: list[str]) -> bool:
+    """
+    Probe a container for an installed binary by running the probe command in it
+
+    Whether a binary is installed does not change while a container exists,
+    so the result is cached by container id and binary and the container is only probed once.
+    """
+    installed = _cached_probe(container, binary)
+    if installed is None:
+        status_code, _ = container.exec_run(cmd=probe)
+        logger.info(f"Probed container {container.name} for {binary} with result {status_code}")
+        installed = status_code == 0
+        _record_probe(container, binary, installed)
+    return installed
+
+
+def _has_tc(container) -> bool:
+    """Probe a container for a tc installation"""
+    return _has_binary(container, "tc", ["tc", "-Version"])
+
+
+def _has_stress_ng(container) -> bool:
+    """Probe a container for a stress-ng installation"""
+    return _has_binary(container, "stress-ng", ["stress-ng", "--version"])
+
+
+def invalidate_capability_cache(container_id: Optional[str] = None) -> None:
+    """Forget the cached probes for a container, or for all containers if no id is given"""
+    if container_id is None:
+        _CAPABILITY_CACHE.clear()
+        return
+    for key in [key for key in _CAPABILITY_CACHE if key[0] == container_id]:
+        del _CAPABILITY_CACHE[key]
+
+
+_NETEM_USERS: dict[tuple[str, str], int] = {}
+"""Number of treatments currently using the netem root qdisc of a (container id, interface) pair"""
+
+
+def _exec_sh(container, script: str) -> tuple[int, bytes]:
+    """Run a shell script in a container with a single exec call and return the exit code and combined output"""
+    return container.exec_run(cmd=["sh", "-c", script], stdout=True, stderr=True, demux=False)
+
+
+def _exec_batch(container, commands: list) -> tuple[int, bytes]:
+    """
+    Run several commands in a container with a single exec call, stopping at the first command that fails
+
+    Commands given as argument lists are quoted, commands given as strings are passed to the shell as they are.
+    """
+    parts = [shlex.join(command) if isinstance(command, list) else command for command in commands]
+    if len(parts) == 1:
+        return _exec_sh(container, parts[0])
+    return _exec_sh(container, " && ".join(f"{{ {part}; }}" for part in parts))
+
+
+def _apply_netem(
+        container, interface: str, netem_args: list[str], prelude: Iterable[list[str]] = ()
+) -> tuple[int, bytes]:
+    """
+    Install a netem root qdisc with the given parameters on an interface of a container
+
+    An existing netem root qdisc is changed in place instead of being deleted and added again,
+    which avoids flushing the queue between successive network treatments. Trying the change first
+    and falling back to an add happens in one shell invocation, so this costs a single exec call.
+    Commands in prelude run in the same exec call before the qdisc is installed.
+    """
+    qdisc = shlex.join(["dev", interface, "root", "netem", *netem_args])
+    script = f"tc qdisc change {qdisc} 2>/dev/null || tc qdisc add {qdisc}"
+    status_code, output = _exec_batch(container, [*prelude, script])
+    if status_code == 0:
+        key = (container.id, interface)
+        _NETEM_USERS[key] = _NETEM_USERS.get(key, 0) + 1
+    return status_code, output
+
+
+def _release_netem(container, interface: str) -> None:
+    """Delete the netem root qdisc of an interface once the last treatment using it is cleaned"""
+    key = (container.id, interface)
+    remaining = _NETEM_USERS.get(key, 0) - 1
+    if remaining > 0:
+        _NETEM_USERS[key] = remaining
+        logger.debug(f"Keeping netem qdisc on {interface} of {container.name} for {remaining} other treatments")
+        return
+    _NETEM_USERS.pop(key, None)
+    container.exec_run(cmd=["tc", "qdisc", "del", "dev", interface, "root", "netem"])
+
+
+_YAML_CACHE: dict[tuple[str, int, int], dict] = {}
+"""Parsed yaml files keyed by path, modification time and size"""
+
+
+def _load_yaml(path: str) -> dict:
+    """
+    Load a yaml file, reusing an earlier parse as long as the file is unchanged
+
+    Callers receive their own copy of the parsed contents and are free to mutate it.
+    An empty file is returned as an empty dict.
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    cached = _YAML_CACHE.get(key)
+    if cached is None:
+        with open(path, "r") as file:
+            cached = yaml.load(file, Loader=_YLoader) or {}
+        _YAML_CACHE[key] = cached
+    return copy.deepcopy(cached)
+
+
+def _atomic_write(path: str, content, mode: str = "w") -> None:
+    """
+    Replace the contents of a file without ever leaving it partially written
+
+    The content is written to a temporary file next to the target, which is then renamed over the target.
+    Symlinks are resolved first and the mode of the target is kept. Only use this for files that are read
+    from the host like Dockerfiles and compose files, a container with a bind mount of the file would keep
+    reading the replaced inode.
+    """
+    target = os.path.realpath(path)
+    fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=f".{os.path.basename(target)}.")
+    try:
+        with os.fdopen(fd, mode) as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(target):
+            shutil.copymode(target, temporary_path)
+        os.replace(temporary_path, target)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def _write_in_place(path: str, content, mode: str = "w") -> None:
+    """
+    Replace the contents of a file, keeping its inode, mode and any symlink pointing to it
+
+    Config files are mounted into running containers as single-file bind mounts, which keep referring to the
+    original inode. Renaming a new file over a bind-mounted file would leave the container reading the stale one.
+    """
+    with open(path, mode) as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _add_trace_processor(extras: dict, name: str, processor: dict) -> dict:
+    """
+    Return a copy of an otelcol extras config with an additional processor
+    that is the only processor in the traces pipeline
+
+    Unrelated parts of the extras config are preserved.
+    """
+    extras = copy.deepcopy(extras)
+    extras.setdefault("processors", {})[name] = processor
+    pipelines = extras.setdefault("service", {}).setdefault("pipelines", {})
+    pipelines.setdefault("traces", {})["processors"] = [name]
+    return extras
+
+
+def run_preconditions(treatments: Iterable[Treatment], max_workers: int = 8) -> dict[Treatment, bool]:
+    """
+    Check the preconditions of several treatments concurrently
+
+    Precondition checks are mostly round-trips to the Docker API, so running them on a thread pool
+    makes the total time depend on the slowest check instead of the sum of all checks.
+
+    :return: A dictionary mapping each treatment to the result of its preconditions method
+    """
+    treatments = list(treatments)
+    if not treatments:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(treatment.preconditions): treatment for treatment in treatments}
+        return {futures[future]: future.result() for future in as_completed(futures)}
+
 
 class EmptyTreatment(Treatment):
     """
@@ -33,36 +289,37 @@ class EmptyTreatment(Treatment):
     def clean(self) -> None:
         pass
 
-    def _transform_params(self) -> None:
+    def _transform_params(self, _t2s=time_string_to_seconds) -> None:
         relative_time_string = self.config.get("duration")
-        relative_time_seconds = time_string_to_seconds(relative_time_string)
+        relative_time_seconds = _t2s(relative_time_string)
         self.config["duration_seconds"] = relative_time_seconds
 
-    def _validate_params(self) -> bool:
-        bools = []
-        for key, value in self.params().items():
-            if key in {"duration", } and key not in self.config:
-                self.messages.append(f"Parameter {key} has to be supplied")
-                bools.append(False)
-            if key in self.config and not isinstance(self.config[key], value):
-                self.messages.append(f"Parameter {key} has to be of type {str(value)}")
-        for key, value in self.config.items():
-            if key == "duration":
-                if not validate_time_string(value):
-                    self.messages.append(
-                        f"Parameter {key} has to match {time_string_format_regex}"
-                    )
-                    bools.append(False)
+    def _validate_params(self, _valid_time=validate_time_string) -> bool:
+        config = self.config
+        message = self.messages.append
+        treatment_type = self.treatment_type
+        bools = [self._check_types()]
+        if "duration" not in config:
+            message(_MSG_MISSING.format_map({"key": "duration", "t": treatment_type}))
+            bools.append(False)
+        duration = config.get("duration")
+        if isinstance(duration, str) and not _valid_time(duration):
+            message(_MSG_NO_MATCH.format_map(
+                {"key": "duration", "pattern": time_string_format_regex, "t": treatment_type}
+            ))
+            bools.append(False)
         return all(bools)
 
     def inject(self) -> None:
         sleep_duration_seconds = self.config.get("duration_seconds")
-        time.sleep(sleep_duration_seconds)
+        self._sleep(sleep_duration_seconds)
+
+    PARAMS: ClassVar[dict] = {
+        "duration": str,
+    }
 
     def params(self) -> dict:
-        return {
-            "duration": str,
-        }
+        return self.PARAMS
 
     def preconditions(self) -> bool:
         return True
@@ -79,24 +336,29 @@ class ByteMonkeyTreatment(Treatment):
     """Compile-time treatment that injects faults into a java service"""
 
     def __init__(self, config, name):
-        super().__init__(config, name)
-        self.docker_client = docker.from_env()
+        # set before super().__init__, since _transform_params populates the dockerfile content
         self.original_entrypoint = ""
         self.dockerfile_content = ""
         self.temporary_jar_path = ""
+        self.jar_in_context = False
+        super().__init__(config, name)
 
     @property
     def action(self):
         return "bytemonkey"
 
+    @property
+    def requires_build(self) -> bool:
+        return True
+
     def preconditions(self) -> bool:
         return True
 
     def build_entrypoint(self) -> str:
-        """Build a modified entrypoint from provided bytemonkey configuration"""
+        """Build the javaagent option for the provided bytemonkey configuration"""
         mode = self.config.get("mode")
         rate = self.config.get("rate")
-        template_string = f"-javaagent:byte-monkey.jar=mode:{mode},rate:{rate},"
+        template_string = f"-javaagent:{BYTE_MONKEY_JAR_NAME}=mode:{mode},rate:{rate},"
         return template_string
 
     def read_dockerfile(self):
@@ -104,84 +366,212 @@ class ByteMonkeyTreatment(Treatment):
         with open(dockerfile_path, "r") as fp:
             self.dockerfile_content = fp.read()
 
+    @property
+    def build_context(self) -> str:
+        """
+        The build context of the service as supplied in the experiment specification
+
+        This has to be the directory that the build context of the service in the compose file points to,
+        e.g. the root of the demo for services built with context: ./ and a dockerfile below src/.
+        """
+        return self.config["context"]
+
     def download_jar(self, url="https://github.com/mrwilson/byte-monkey/releases/download/1.0.0/byte-monkey.jar"):
-        response = requests.get(url)
-        response.raise_for_status()
-        with tempfile.NamedTemporaryFile(suffix="jar", delete=False) as temporary_jar:
-            self.temporary_jar_path = temporary_jar.path
-            with open(self.temporary_jar_path, "wb") as fp:
-                fp.write(response.content)
+        """Download the byte-monkey agent unless a cached copy exists"""
+        if os.path.exists(BYTE_MONKEY_JAR_CACHE):
+            logger.debug(f"Using cached byte-monkey jar at {BYTE_MONKEY_JAR_CACHE}")
+            return
+        os.makedirs(os.path.dirname(BYTE_MONKEY_JAR_CACHE), exist_ok=True)
+        # stream to a temporary file so an interrupted download never leaves a truncated jar in the cache
+        partial_path = f"{BYTE_MONKEY_JAR_CACHE}.tmp"
+        with requests.get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            with open(partial_path, "wb") as fp:
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    fp.write(chunk)
+        os.replace(partial_path, BYTE_MONKEY_JAR_CACHE)
+
+    def copy_jar(self) -> None:
+        """
+        Copy the cached byte-monkey agent into the build context so the Dockerfile can COPY it
+
+        A jar that is already present in the build context is left alone and not removed on clean.
+        """
+        self.temporary_jar_path = os.path.join(self.build_context, BYTE_MONKEY_JAR_NAME)
+        if os.path.exists(self.temporary_jar_path):
+            return
+        shutil.copyfile(BYTE_MONKEY_JAR_CACHE, self.temporary_jar_path)
+        self.jar_in_context = True
+
+    def remove_jar(self) -> None:
+        """Remove the byte-monkey agent from the build context if it was copied there by this treatment"""
+        if self.jar_in_context:
+            os.remove(self.temporary_jar_path)
+            self.jar_in_context = False
 
     def modify_dockerfile(self):
-        """Modify the dockerfile to add the bytemonkey dependency and modify the entrypoint"""
-        dockerfile_lines = self.dockerfile_content.splitlines()
-        for idx, line in enumerate(dockerfile_lines):
-            if line.startswith("ENTRYPOINT"):
-                self.original_entrypoint = ""
-                dockerfile_lines.insert(idx, f"COPY {self.temporary_jar_path} ./")
-                dockerfile_lines[idx] = f"{self.original_entrypoint} {self.build_entrypoint()}"
-        return "\n".join(dockerfile_lines)
+        """
+        Modify the dockerfile to add the bytemonkey dependency and load it into the JVM
+
+        The agent is appended to JAVA_TOOL_OPTIONS in front of the entrypoint instead of editing the entrypoint,
+        which works for exec and shell form entrypoints alike and keeps agents configured by the image in place.
+        """
+        content = self.dockerfile_content
+        match = _ENTRYPOINT_RE.search(content)
+        if match is None:
+            logger.warning(f"No ENTRYPOINT found in {self.config.get('dockerfile')} for {self.name}")
+            return content
+        self.original_entrypoint = match.group(0)
+        patched = (
+            f"COPY {BYTE_MONKEY_JAR_NAME} ./\n"
+            f'ENV JAVA_TOOL_OPTIONS="${{JAVA_TOOL_OPTIONS}} {self.build_entrypoint()}"\n'
+            f"{self.original_entrypoint}"
+        )
+        return content[:match.start()] + patched + content[match.end():]
 
     def restore_entrypoint(self):
-        dockerfile_lines = self.dockerfile_content.splitlines()
-        for idx, line in enumerate(dockerfile_lines):
-            if line.startswith("ENTRYPOINT"):
-                dockerfile_lines[idx] = self.original_entrypoint
-        return "\n".join(dockerfile_lines)
+        """Return the original dockerfile, modify_dockerfile only adds lines in front of the entrypoint"""
+        return self.dockerfile_content
 
     def write_dockerfile(self, new_content: str):
         dockerfile_path = self.config.get("dockerfile")
-        with open(dockerfile_path, "w") as fp:
-            fp.write(new_content)
+        _atomic_write(dockerfile_path, new_content)
 
     def inject(self) -> None:
-        """Update the Dockerfile to modify the java entrypoint and re-build the image"""
-        self.read_dockerfile()
-        self.write_dockerfile(new_content=self.build_entrypoint())
+        """
+        Place the byte-monkey agent in the build context and update the Dockerfile to load it
+
+        The image is rebuilt from the updated Dockerfile when the system under experiment is built.
+        """
+        self.download_jar()
+        self.copy_jar()
+        self.write_dockerfile(new_content=self.modify_dockerfile())
 
     def clean(self) -> None:
-        """Restore the original docker entrypoint"""
-        self.write_dockerfile(new_content=self.dockerfile_content)
+        """Restore the original docker entrypoint and remove the agent from the build context"""
+        self.write_dockerfile(new_content=self.restore_entrypoint())
+        self.remove_jar()
+
+    PARAMS: ClassVar[dict] = {
+        "mode": str,
+        "rate": float,
+        "dockerfile": str,
+        "service_name": str,
+        "context": str,
+    }
 
     def params(self) -> dict:
-        return {
-            "mode": str,
-            "rate": float,
-            "dockerfile": str,
-            "service_name": str,
-        }
+        return self.PARAMS
 
     def _validate_params(self) -> bool:
-        pass
+        config = self.config
+        message = self.messages.append
+        treatment_type = self.treatment_type
+        self._check_types()
+        for key in self.params():
+            if key not in config:
+                message(_MSG_MISSING.format_map({"key": key, "t": treatment_type}))
+        mode = config.get("mode")
+        if isinstance(mode, str) and mode not in BYTE_MONKEY_MODES:
+            message(_MSG_NOT_ONE_OF.format_map({"key": "mode", "choices": list(BYTE_MONKEY_MODES), "t": treatment_type}))
+        rate = config.get("rate")
+        if isinstance(rate, float) and not 0 <= rate <= 1:
+            message(_MSG_OUT_OF_RANGE.format_map({"key": "rate", "range": "[0, 1]", "t": treatment_type}))
+        dockerfile = config.get("dockerfile")
+        if isinstance(dockerfile, str) and not os.path.isfile(dockerfile):
+            message(_MSG_NOT_FOUND.format_map({"key": "dockerfile", "kind": "file", "t": treatment_type}))
+        context = config.get("context")
+        if isinstance(context, str) and not os.path.isdir(context):
+            message(_MSG_NOT_FOUND.format_map({"key": "context", "kind": "directory", "t": treatment_type}))
+        return not self.messages
 
     def _transform_params(self) -> None:
-        pass
+        """Read the Dockerfile once, both inject and clean work from this snapshot"""
+        self.read_dockerfile()
+
+    def is_runtime(self) -> bool:
+        return False
+
+
+class NetemTreatment(Treatment):
+    """
+    Base class for treatments that install a netem root qdisc on an interface of a service
+
+    Subclasses build the netem arguments and inject them with _inject_netem,
+    clean releases the qdisc only if the injection installed it.
+    """
+
+    fault = "netem"
+    """Name of the injected fault in log messages"""
+
+    netem_acquired = False
+    """True while this treatment holds a reference on the netem qdisc it installed"""
+
+    @property
+    def exclusive_resource(self):
+        # netem parameters of concurrent treatments on the same interface would replace each other
+        return "netem", self.config.get("service_name"), self.config.get("interface") or "eth0"
+
+    def _inject_netem(self, netem_args: list[str], duration) -> None:
+        """Install a netem qdisc with the given arguments on the configured interface and hold it for duration seconds"""
+        service, interface = self.config["service_name"], self.config["interface"]
+        try:
+            container = _get_container(self)
+            # without an earlier preconditions check, probe for tc in the same exec call as the injection
+            probed = _cached_probe(container, "tc") is not None
+            status_code, output = _apply_netem(
+                container, interface, netem_args, prelude=() if probed else [["tc", "-Version"]]
+            )
+            self.netem_acquired = status_code == 0
+            if status_code != 0:
+                logger.error(f"Could not inject {self.fault} into container {service} (exit={status_code}): {output!r}")
+                return
+            if not probed:
+                _record_probe(container, "tc", True)
+            logger.info(
+                f"Injected {self.fault} into container {service}. Waiting for {duration}s."
+            )
+            self._sleep(duration)
+        except ContainerNotFound:
+            logger.error(f"Can't find container {service}")
+        except DockerAPIError as e:
+            logger.error(f"Docker API returned an error: {e.explanation}")
+
+    def clean(self) -> None:
+        interface = self.config.get("interface") or "eth0"
+        service = self.config.get("service_name")
+        if not self.netem_acquired:
+            logger.debug(f"No netem qdisc was installed by {self.name}, nothing to clean")
+            return
+        try:
+            container = _get_container(self)
+            _release_netem(container, interface)
+            self.netem_acquired = False
+            logger.info(f"Cleaned {self.fault} treatment from container {service}")
+        except (ContainerNotFound, DockerAPIError) as e:
+            logger.error(
+                f"Cannot clean {self.fault} treatment from container {service}: {e.explanation}"
+            )
+            logger.error(f"Container state for {service} might be polluted now")
+
 
+class CorruptPacketTreatment(NetemTreatment):
+    fault = "packet corruption"
 
-class CorruptPacketTreatment(Treatment):
     def action(self):
         return "corrupt"
 
     def preconditions(self) -> bool:
         """Check if the service has tc installed"""
         service = self.config.get("service_name")
-        command = [
-            "tc",
-            "-Version"
-        ]
-        client = docker.from_env()
         try:
-            container = client.containers.get(container_id=service)
-            status_code, _ = container.exec_run(cmd=command)
-            logger.info(
-                f"Probed container {service} for tc with result {status_code}"
-            )
-            if not status_code == 0:
+            has_tc = _has_tc(_get_container(self))
+            if not has_tc:
                 self.messages.append(
                     f"Container {service} does not have tc installed which is required for {self}. Please install "
                     "package iptables2 in the container"
                 )
-            return status_code == 0
+            return has_tc
 
         except ContainerNotFound:
             logger.error(f"Can't find container {service}")
@@ -191,93 +581,53 @@ class CorruptPacketTreatment(Treatment):
             return False
 
     def inject(self) -> None:
-        service = self.config.get("service_name")
-        interface = self.config.get("interface")
-        duration = self.config.get("duration_seconds")
-        percentage = self.config.get("corrupt_percentage")
+        config = self.config
+        duration, percentage = config["duration_seconds"], config["corrupt_percentage"]
         # optional param with default arg
-        correlation = self.config.get("corrupt_correlation") or "0%"
-
-        command = [
-            "tc",
-            "qdic",
-            "add",
-            "dev",
-            interface,
-            "root",
-            "netem",
-            "corrupt",
-            percentage,
-            correlation,
-        ]
-
-        client = docker.from_env()
-        try:
-            container = client.containers.get(container_id=service)
-            container.exec_run(cmd=command)
-            logger.info(
-                f"Injected packet corruption into container {service}. Waiting for {duration}s."
-            )
-            time.sleep(duration)
-        except ContainerNotFound:
-            logger.error(f"Can't find container {service}")
-        except DockerAPIError as e:
-            logger.error(f"Docker API returned an error: {e.explanation}")
+        correlation = config.get("corrupt_correlation") or "0%"
 
-    def clean(self) -> None:
-        interface = self.config.get("interface") or "eth0"
-        service = self.config.get("service_name")
-        command = ["tc", "qdisc", "del", "dev", interface, "root", "netem"]
-        client = docker.from_env()
-        try:
-            container = client.containers.get(container_id=service)
-            container.exec_run(cmd=command)
-            logger.info(f"Cleaned delay treatment from container {service}")
-        except (ContainerNotFound, DockerAPIError) as e:
-            logger.error(
-                f"Cannot clean delay treatment from container {service}: {e.explanation}"
-            )
-            logger.error(f"Container state for {service} might be polluted now")
+        netem_args = ["corrupt", percentage, correlation]
+
+        self._inject_netem(netem_args, duration)
+
+    PARAMS: ClassVar[dict] = {
+        "service_name": str,
+        "interface": str,
+        "duration": str,
+        "corrupt_percentage": str,
+        "corrupt_correlation": Optional[str],
+    }
 
     def params(self) -> dict:
-        return {
-            "service_name": str,
-            "interface": str,
-            "duration": str,
-            "corrupt_percentage": str,
-            "corrupt_correlation": Optional[str],
+        return self.PARAMS
+
+    def _validate_params(self, _valid_time=validate_time_string) -> bool:
+        config = self.config
+        message = self.messages.append
+        treatment_type = self.treatment_type
+        bools = [self._check_types()]
+        checks = {
+            "duration": (_valid_time, time_string_format_regex),
+            "corrupt_percentage": (_PCT_STRICT_RE.match, _PCT_STRICT_RE.pattern),
+            "corrupt_correlation": (_PCT_STRICT_RE.match, _PCT_STRICT_RE.pattern),
         }
-
-    def _validate_params(self) -> bool:
-        bools = []
-        for key, value in self.params().items():
-            # required params
-            if (
-                    key in {"service_name", "duration", "interface", "corrupt_percentage"}
-                    and key not in self.config
-            ):
-                self.messages.append(f"Parameter {key} has to be supplied")
-                bools.append(False)
-            # supplied params have correct type
-            if key in self.config and not isinstance(self.config[key], value):
-                self.messages.append(f"Parameter {key} has to be of type {str(value)}")
-        for key, value in self.config.items():
-            if key == "duration":
-                if not validate_time_string(value):
-                    self.messages.append(
-                        f"Parameter {key} has to match {time_string_format_regex}"
-                    )
-                    bools.append(False)
-            if key in {"corrupt_percentage", "corrupt_correlation"}:
-                format_regex = r"^[1-9][0-9]?\%$|^100\%$"
-                if not bool(re.match(format_regex, value)):
-                    self.messages.append(f"Parameter {key} has to match {format_regex}")
+        for key in self.params():
+            if key not in config:
+                # corrupt_correlation is optional
+                if key != "corrupt_correlation":
+                    message(_MSG_MISSING.format_map({"key": key, "t": treatment_type}))
                     bools.append(False)
+                continue
+            value = config[key]
+            valid, pattern = checks.get(key, (None, None))
+            if valid and isinstance(value, str) and not valid(value):
+                message(_MSG_NO_MATCH.format_map({"key": key, "pattern": pattern, "t": treatment_type}))
+                bools.append(False)
         return all(bools)
 
-    def _transform_params(self) -> None:
+    def _transform_params(self, _t2s=time_string_to_seconds) -> None:
         relative_time_string = self.config.get("duration")
-        relative_time_seconds = time_string_to_seconds(relative_time_string)
+        relative_time_seconds = _t2s(relative_time_string)
         self.config["duration_seconds"] = relative_time_seconds
 
     def is_runtime(self) -> bool:
@@ -291,12 +641,10 @@ class MetricsExportIntervalTreatment(Treatment):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.original_yaml = None
         # TODO: reuse the existing docker compose client
         self.compose_client = DockerClient(
             compose_files=[self.config.get("compose_file")]
         )
-        self.docker_client = docker.from_env()
 
     def action(self):
         return "otel_metrics_interval"
@@ -306,9 +654,10 @@ class MetricsExportIntervalTreatment(Treatment):
         return True
 
     def inject(self) -> None:
-        service = self.config.get("service_name")
-        compose_file = self.config.get("compose_file")
-        interval_ms = self.config.get("interval_ms")
+        config = self.config
+        service, compose_file, interval_ms = (
+            config["service_name"], config["compose_file"], config["interval_ms"]
+        )
 
         add_env_variable(
             compose_file_path=compose_file,
@@ -318,44 +667,44 @@ class MetricsExportIntervalTreatment(Treatment):
         )
 
     def clean(self) -> None:
-        original_compose_file = self.config["original_yaml"]
+        """Restore the compose file byte for byte from the snapshot taken in _transform_params"""
         compose_file_path = self.config.get("compose_file")
-        with open(compose_file_path, "w+") as file:
-            file.write(yaml.safe_dump(original_compose_file, default_flow_style=False))
+        _atomic_write(compose_file_path, self.config["original_bytes"], mode="wb")
 
-    def params(self) -> dict:
-        return {
-            "compose_file": str,
-            "service_name": str,
-            "interval": str,
-        }
+    PARAMS: ClassVar[dict] = {
+        "compose_file": str,
+        "service_name": str,
+        "interval": str,
+    }
 
-    def _validate_params(self) -> bool:
-        for key, value in self.params().items():
-            if key not in self.config:
-                self.messages.append(f"Parameter {key} has to be supplied")
-            if not isinstance(self.config[key], value):
-                self.messages.append(f"Parameter {key} has to be of type {str(value)}")
-        for key in self.config.items():
-            if key == "percentage" and not 0 <= self.config[key] <= 100:
-                self.messages.append(
-                    f"Value for key {key} has to be in the range [0, 100] for {self.treatment_type}"
-                )
-            if key == "interval" and not validate_time_string(self.config[key]):
-                self.messages.append(
-                    f"Value for parameter {key} has to match {time_string_format_regex} for {self.treatment_type}"
-                )
+    def params(self) -> dict:
+        return self.PARAMS
+
+    def _validate_params(self, _valid_time=validate_time_string) -> bool:
+        config = self.config
+        message = self.messages.append
+        treatment_type = self.treatment_type
+        self._check_types()
+        for key in self.params():
+            if key not in config:
+                message(_MSG_MISSING.format_map({"key": key, "t": treatment_type}))
+        interval = config.get("interval")
+        if isinstance(interval, str) and not _valid_time(interval):
+            message(_MSG_NO_MATCH.format_map(
+                {"key": "interval", "pattern": time_string_format_regex, "t": treatment_type}
+            ))
         return not self.messages
 
-    def _transform_params(self) -> None:
+    def _transform_params(self, _t2s=time_string_to_seconds) -> None:
         """Convert the provided time string into milliseconds"""
-        interval_s = time_string_to_seconds(self.config["interval"])
+        interval_s = _t2s(self.config["interval"])
         interval_ms = to_milliseconds(interval_s)
         self.config["interval_ms"] = interval_ms
 
+        # keep the raw contents so clean can restore the file without a yaml round-trip
         compose_file_path = self.config.get("compose_file")
-        with open(compose_file_path, "r") as file:
-            self.config["original_yaml"] = yaml.safe_load(file.read())
+        with open(compose_file_path, "rb") as file:
+            self.config["original_bytes"] = file.read()
 
     def is_runtime(self) -> bool:
         return False
@@ -366,10 +715,6 @@ class ProbabilisticSamplingTreatment(Treatment):
     Add a probabilistic sampling policy to the opentelemetry collector
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.client = docker.from_env()
-
     @property
     def action(self):
         return "probl"
@@ -386,65 +731,49 @@ class ProbabilisticSamplingTreatment(Treatment):
         # support only the base attributes for now
         sampling_percentage = self.config.get("percentage")
         seed = self.config.get("seed")
-        updated_extras = {
-            "processors": {
-                "probabilistic_sampler": {
-                    "hash_seed": seed,
-                    "sampling_percentage": sampling_percentage
-                }
-            },
-            "service": {
-                "pipelines": {
-                    "traces": {
-                        "processors": ["probabilistic_sampler"],
-                    }
-                }
+        # the original extras were loaded in _transform_params, so there is no need to read the file again
+        updated_extras = _add_trace_processor(
+            extras=self.config.get("otelcol_extras_yaml"),
+            name="probabilistic_sampler",
+            processor={
+                "hash_seed": seed,
+                "sampling_percentage": sampling_percentage,
             },
-        }
-        with open(path, "w+") as file:
-            existing_config = yaml.safe_load(file.read())
-            if not existing_config:
-                existing_config = {}
-            existing_config.update(updated_extras)
-            yaml.dump(existing_config, file, default_flow_style=False)
+        )
+        _write_in_place(path, yaml.dump(updated_extras, Dumper=_YDumper, default_flow_style=False))
 
     def clean(self) -> None:
-        original_extras = self.config.get("otelcol_extras_yaml")
+        """Restore the otelcol extras file byte for byte from the snapshot taken in _transform_params"""
         path = self.config.get("otelcol_extras")
-        with open(path, "w+") as file:
-            file.write(yaml.dump(original_extras, default_flow_style=False))
+        _write_in_place(path, self.config["original_bytes"], mode="wb")
+
+    PARAMS: ClassVar[dict] = {
+        "otelcol_extras": str,
+        "percentage": int,
+        "seed": int,
+    }
 
     def params(self) -> dict:
-        return {
-            "otelcol_extras": str,
-            "percentage": int,
-            "seed": int,
-        }
+        return self.PARAMS
 
     def _validate_params(self) -> bool:
-        for key, value in self.params().items():
-            if key == "otelcol_extras" and key not in self.config:
-                self.messages.append(f"Key {key} is required for {self.treatment_type}")
-            if key == "percentage" and key not in self.config:
-                self.messages.append(f"Key {key} is required for {self.treatment_type}")
-            if key == "seed" and key not in self.config:
-                self.messages.append(f"Key {key} is required for {self.treatment_type}")
-            if key in self.config and not isinstance(self.config[key], value):
-                self.messages.append(f"Key {key} has to be of type {value} for {self.treatment_type}")
-        for key in self.config.items():
-            if key == "percentage" and not 0 <= self.config[key] <= 100:
-                self.messages.append(
-                    f"Value for key {key} has to be in the range [0, 100] for {self.treatment_type}"
-                )
+        config = self.config
+        message = self.messages.append
+        treatment_type = self.treatment_type
+        self._check_types()
+        for key in ("otelcol_extras", "percentage", "seed"):
+            if key not in config:
+                message(_MSG_MISSING.format_map({"key": key, "t": treatment_type}))
+        percentage = config.get("percentage")
+        if isinstance(percentage, int) and not 0 <= percentage <= 100:
+            message(_MSG_OUT_OF_RANGE.format_map({"key": "percentage", "range": "[0, 100]", "t": treatment_type}))
         return not self.messages
 
     def _transform_params(self) -> None:
         path = self.config.get("otelcol_extras")
-        with open(path, "r") as file:
-            contents = yaml.safe_load(file.read())
-            if not contents:
-                contents = {}
-            self.config["otelcol_extras_yaml"] = contents
+        with open(path, "rb") as file:
+            self.config["original_bytes"] = file.read()
+        self.config["otelcol_extras_yaml"] = _load_yaml(path)
 
 
 class TailSamplingTreatment(Treatment):
@@ -455,10 +784,6 @@ class TailSamplingTreatment(Treatment):
     changing the config.
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.client = docker.from_env()
-
     @property
     def action(self):
         return "tail"
@@ -477,61 +802,69 @@ class TailSamplingTreatment(Treatment):
     def inject(self) -> None:
         """Write the policy to the otelcol-extras file"""
         path = self.config.get("otelcol_extras")
-        # get existing configuration
-        # inject the policy
         policy_type = self.config.get("type")
         policy_name = self.config.get("policy_name")
         policy_params = self.config.get("policy_params")
-        updated_extras = {
-            "processors": {
-                "tail_sampling": {
-                    "policies": [
-                        {
-                            "name": policy_name,
-                            "type": policy_type,
-                            policy_type: policy_params,
-                        }
-                    ]
-                }
-            },
-            "service": {
-                "pipelines": {
-                    "traces": {
-                        "processors": ["tail_sampling"],
+        # inject the policy into the existing configuration loaded in _transform_params
+        updated_extras = _add_trace_processor(
+            extras=self.config.get("otelcol_extras_yaml"),
+            name="tail_sampling",
+            processor={
+                "policies": [
+                    {
+                        "name": policy_name,
+                        "type": policy_type,
+                        policy_type: policy_params,
                     }
-                }
+                ]
             },
-        }
-        with open(path, "w+") as file:
-            file.write(yaml.dump(updated_extras, default_flow_style=False))
+        )
+        _write_in_place(path, yaml.dump(updated_extras, Dumper=_YDumper, default_flow_style=False))
 
-        # restart the collector and block until it has restarted
-        container = self.client.containers.get("otel-col")
-        container.stop()
-        container.wait()
-        container.start()
+        # restart the collector and block until it is running again, so the treatment window starts afterwards
+        container = _get_container(self, "otel-col")
+        container.restart(timeout=1)
+        if not self._wait_until_running(container):
+            logger.warning(f"Container {container.name} is not running after restart for {self.treatment_type}")
 
         duration = self.config.get("duration", "0m")
         if duration:
             seconds = time_string_to_seconds(duration)
-            time.sleep(seconds)
+            self._sleep(seconds)
+
+    @staticmethod
+    def _wait_until_running(container, timeout: float = 5.0, interval: float = 0.1) -> bool:
+        """
+        Poll the container state until it reports running or the timeout elapses
+
+        The collector in the demo does not expose a health check endpoint to the host,
+        so the container state reported by Docker is the best readiness signal we have.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            container.reload()
+            if container.status == "running":
+                return True
+            time.sleep(interval)
+        return False
 
     def clean(self) -> None:
-        original_extras = self.config.get("otelcol_extras_yaml")
+        """Restore the otelcol extras file byte for byte from the snapshot taken in _transform_params"""
         path = self.config.get("otelcol_extras")
-        with open(path, "w+") as file:
-            file.write(yaml.dump(original_extras, default_flow_style=False))
+        _write_in_place(path, self.config["original_bytes"], mode="wb")
+
+    PARAMS: ClassVar[dict] = {
+        "otelcol_extras": str,
+        "policy_name": str,
+        "decision_wait": str,
+        "num_traces": int,
+        "expected_new_traces": int,
+        "type": str,
+        "policy_params": dict,
+    }
 
     def params(self) -> dict:
-        return {
-            "otelcol_extras": str,
-            "policy_name": str,
-            "decision_wait": str,
-            "num_traces": int,
-            "expected_new_traces": int,
-            "type": str,
-            "policy_params": dict,
-        }
+        return self.PARAMS
 
     def _validate_params(self) -> bool:
         # TODO: implement the method
@@ -539,19 +872,13 @@ class TailSamplingTreatment(Treatment):
 
     def _transform_params(self) -> None:
         path = self.config.get("otelcol_extras")
-        with open(path, "r") as file:
-            contents = yaml.safe_load(file.read())
-            if not contents:
-                contents = {}
-            self.config["otelcol_extras_yaml"] = contents
+        with open(path, "rb") as file:
+            self.config["original_bytes"] = file.read()
+        self.config["otelcol_extras_yaml"] = _load_yaml(path)
 
 
 class PauseTreatment(Treatment):
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.client = docker.from_env()
-
     def is_runtime(self) -> bool:
         return True
 
@@ -559,44 +886,44 @@ class PauseTreatment(Treatment):
     def action(self):
         return "pause"
 
-    def params(self) -> dict:
-        return {
-            "service_name": str,
-            "duration": str,
-        }
+    @property
+    def controls_lifecycle(self) -> bool:
+        return True
 
-    def _validate_params(self) -> bool:
-        for key, value in self.params().items():
-            # required key
-            if key == "service_name" and key not in self.config:
-                self.messages.append(f"Key {key} is required for {self.treatment_type}")
-            # required key
-            if key == "duration" and key not in self.config:
-                self.messages.append(f"Key {key} is required for {self.treatment_type}")
-            # key has correct type
-            if key in self.config and not isinstance(self.config[key], value):
-                self.messages.append(
-                    f"Key {key} has to be of type {value} for {self.treatment_type}"
-                )
-        for key in self.config.items():
-            # if an interval is supplied, a timeout needs to be supplied as well
-            if key == "duration" and not validate_time_string(self.config[key]):
-                self.messages.append(
-                    f"Value for key {key} has to match {time_string_format_regex} for {self.treatment_type}"
-                )
+    PARAMS: ClassVar[dict] = {
+        "service_name": str,
+        "duration": str,
+    }
+
+    def params(self) -> dict:
+        return self.PARAMS
+
+    def _validate_params(self, _valid_time=validate_time_string) -> bool:
+        config = self.config
+        message = self.messages.append
+        treatment_type = self.treatment_type
+        self._check_types()
+        for key in ("service_name", "duration"):
+            if key not in config:
+                message(_MSG_MISSING.format_map({"key": key, "t": treatment_type}))
+        duration = config.get("duration")
+        if isinstance(duration, str) and not _valid_time(duration):
+            message(_MSG_NO_MATCH.format_map(
+                {"key": "duration", "pattern": time_string_format_regex, "t": treatment_type}
+            ))
         return not self.messages
 
-    def _transform_params(self) -> None:
+    def _transform_params(self, _t2s=time_string_to_seconds) -> None:
         if "duration" in self.config:
             relative_time_string = self.config.get("duration")
-            relative_time_seconds = time_string_to_seconds(relative_time_string)
+            relative_time_seconds = _t2s(relative_time_string)
             self.config |= {"duration_seconds": relative_time_seconds}
 
     def preconditions(self) -> bool:
         """Check if the docker daemon is running and the container is running"""
         service = self.config.get("service_name")
         try:
-            container = self.client.containers.get(container_id=service)
+            container = _get_container(self, reload=True)
             container_state = container.status
             logger.info(
                 f"Probed container {service} for state running with result {container_state}"
@@ -622,7 +949,7 @@ class PauseTreatment(Treatment):
         service = self.config.get("service_name")
 
         try:
-            container = self.client.containers.get(container_id=service)
+            container = _get_container(self)
             container.pause()
         except ContainerNotFound:
             logger.error(f"Can't find container {service}")
@@ -631,15 +958,14 @@ class PauseTreatment(Treatment):
         logger.info(
             f"Injected pause into container {service}. Waiting for {duration_seconds}s"
         )
-        time.sleep(duration_seconds)
+        self._sleep(duration_seconds)
 
     def clean(self):
         service = self.config.get("service_name")
         try:
-            container = self.client.containers.get(container_id=service)
+            container = _get_container(self)
             container.unpause()
             logger.debug(f"Cleaned pause from container {service}.")
-            self.client.close()
         except (ContainerNotFound, DockerAPIError) as e:
             logger.error(
                 f"Cannot clean pause treatment from container {service}: {e.explanation}"
@@ -647,85 +973,73 @@ class PauseTreatment(Treatment):
             logger.error(f"Container state for {service} might be polluted now")
 
 
-class NetworkDelayTreatment(Treatment):
+class NetworkDelayTreatment(NetemTreatment):
     """Inject network delay into a service"""
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.client = docker.from_env()
-
     action = "delay"
 
+    fault = "delay"
+
     def is_runtime(self) -> bool:
         return True
 
-    def _validate_params(self) -> bool:
-        for key, val in self.params().items():
-            # required params
-            if (
-                    key in {"service_name", "duration", "interface", "delay_time"}
-                    and key not in self.config
-            ):
-                self.messages.append(
-                    f"Parameter {key} has to be supplied for {self.treatment_type}"
-                )
-            # supplied params have correct type
-            if key in self.config and not isinstance(self.config[key], val):
-                self.messages.append(
-                    f"Parameter {key} has to be of type {val.__class__.__name__} for {self.treatment_type}"
-                )
-        for key, value in self.config.items():
-            if key in {"duration", "delay_time", "delay_jitter"}:
-                if not validate_time_string(value):
-                    self.messages.append(
-                        f"Value for parameter {key} has to match {time_string_format_regex} for {self.treatment_type}"
-                    )
-            if key == "delay_correlation":
-                format_regex = r"\d+\%"
-                if not bool(re.match(format_regex, value)):
-                    self.messages.append(
-                        f"Value for parameter {key} has to match {format_regex} for {self.treatment_type}"
-                    )
-            if key == "distribution":
-                distribution_set = {"uniform", "pareto", "normal", "paretonormal"}
-                if key not in distribution_set:
-                    self.messages.append(
-                        f"Value for parameter {key} has to be one of {distribution_set} for {self.treatment_type}"
-                    )
+    def _validate_params(self, _valid_time=validate_time_string) -> bool:
+        config = self.config
+        message = self.messages.append
+        treatment_type = self.treatment_type
+        self._check_types()
+        checks = {
+            "duration": (_valid_time, time_string_format_regex),
+            "delay_time": (_valid_time, time_string_format_regex),
+            "delay_jitter": (_valid_time, time_string_format_regex),
+            "delay_correlation": (_PCT_LOOSE_RE.match, _PCT_LOOSE_RE.pattern),
+        }
+        for key in ("service_name", "duration", "interface", "delay_time"):
+            if key not in config:
+                message(_MSG_MISSING.format_map({"key": key, "t": treatment_type}))
+        for key, (valid, pattern) in checks.items():
+            value = config.get(key)
+            if isinstance(value, str) and not valid(value):
+                message(_MSG_NO_MATCH.format_map({"key": key, "pattern": pattern, "t": treatment_type}))
+        distribution_set = {"uniform", "pareto", "normal", "paretonormal"}
+        distribution = config.get("delay_distribution")
+        if isinstance(distribution, str) and distribution not in distribution_set:
+            message(_MSG_NOT_ONE_OF.format_map(
+                {"key": "delay_distribution", "choices": sorted(distribution_set), "t": treatment_type}
+            ))
         return not self.messages
 
-    def _transform_params(self) -> None:
+    def _transform_params(self, _t2s=time_string_to_seconds) -> None:
         # correctly formatted params can be passed to tc directly as it can handle values + units
-        # we need only transform the duration into seconds for the time.sleep call
+        # we need only transform the duration into seconds for the self._sleep call
         relative_time_string = self.config.get("duration")
-        relative_time_seconds = time_string_to_seconds(relative_time_string)
+        relative_time_seconds = _t2s(relative_time_string)
         self.config["duration_seconds"] = relative_time_seconds
 
+    PARAMS: ClassVar[dict] = {
+        "service_name": str,
+        "interface": str,
+        "duration": str,
+        "delay_time": str,
+        "delay_jitter": Optional[str],
+        "delay_correlation": Optional[str],
+        "delay_distribution": Optional[str],
+    }
+
     def params(self) -> dict:
-        return {
-            "service_name": str,
-            "interface": str,
-            "duration": str,
-            "delay_time": str,
-            "delay_jitter": Optional[str],
-            "delay_correlation": Optional[str],
-            "delay_distribution": Optional[str],
-        }
+        return self.PARAMS
 
     def preconditions(self) -> bool:
         """Check if the service has tc installed"""
         service = self.config.get("service_name")
-        command = ["tc", "-Version"]
         try:
-            container = self.client.containers.get(container_id=service)
-            status_code, _ = container.exec_run(cmd=command)
-            logger.info(f"Probed container {service} for tc with result {status_code}")
-            if not status_code == 0:
+            has_tc = _has_tc(_get_container(self))
+            if not has_tc:
                 self.messages.append(
                     f"Container {service} does not have tc installed which is required for {self.treatment_type}. Please install "
                     "package iptables2 in the container"
                 )
-            return status_code == 0
+            return has_tc
 
         except ContainerNotFound:
             self.messages.append(f"Can't find container {service}")
@@ -735,120 +1049,75 @@ class NetworkDelayTreatment(Treatment):
             return False
 
     def inject(self) -> None:
+        config = self.config
         # required params
-        service = self.config.get("service_name")
-        interface = self.config.get("interface")
-        delay_time = self.config.get("delay_time")
-        duration = self.config.get("duration_seconds")
-        # optional params: use default values so we dont need to construct multiple commands
-        jitter = self.config.get("delay_jitter", "0ms")
-        correlation = self.config.get("delay_correlation", "0%")
-        command = [
-            "tc",
-            "qdisc",
-            "add",
-            "dev",
-            interface,
-            "root",
-            "netem",
-            "delay",
-            delay_time,
-            jitter,
-            correlation,
-        ]
-        try:
-            container = self.client.containers.get(container_id=service)
-            container.exec_run(cmd=command)
-            logger.info(
-                f"Injected delay into container {service}. Waiting for {duration}s."
-            )
-            time.sleep(duration)
-        except ContainerNotFound:
-            logger.error(f"Can't find container {service}")
-        except DockerAPIError as e:
-            logger.error(f"Docker API returned an error: {e.explanation}")
-
-    def clean(self) -> None:
-        interface = self.config.get("interface") or "eth0"
-        service = self.config.get("service_name")
-        command = ["tc", "qdisc", "del", "dev", interface, "root", "netem"]
-        try:
-            container = self.client.containers.get(container_id=service)
-            container.exec_run(cmd=command)
-            logger.info(f"Cleaned delay treatment from container {service}")
-            self.client.close()
-        except (ContainerNotFound, DockerAPIError) as e:
-            logger.error(
-                f"Cannot clean delay treatment from container {service}: {e.explanation}"
-            )
-            logger.error(f"Container state for {service} might be polluted now")
+        delay_time, duration = config["delay_time"], config["duration_seconds"]
+        # optional params: use default values so we dont need to construct multiple commands,
+        # also when the spec supplies an explicit null
+        jitter = config.get("delay_jitter") or "0ms"
+        correlation = config.get("delay_correlation") or "0%"
+        netem_args = ["delay", delay_time, jitter, correlation]
+        self._inject_netem(netem_args, duration)
 
 
-class PacketLossTreatment(Treatment):
+class PacketLossTreatment(NetemTreatment):
     """Inject packet loss into a service"""
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.client = docker.from_env()
-
     action = "loss"
 
+    fault = "packet loss"
+
     def is_runtime(self) -> bool:
         return True
 
+    PARAMS: ClassVar[dict] = {
+        "service_name": str,
+        "duration": str,
+        "interface": str,
+        "loss_percentage": str,
+    }
+
     def params(self) -> dict:
-        return {
-            "service_name": str,
-            "duration": str,
-            "interface": str,
-            "loss_percentage": str,
+        return self.PARAMS
+
+    def _validate_params(self, _valid_time=validate_time_string) -> bool:
+        config = self.config
+        message = self.messages.append
+        treatment_type = self.treatment_type
+        # only supplied params are type checked, so a missing param is reported once and never looked up
+        self._check_types()
+        checks = {
+            "duration": (_valid_time, time_string_format_regex),
+            "loss_percentage": (_PCT_STRICT_RE.match, _PCT_STRICT_RE.pattern),
         }
-
-    def _validate_params(self) -> bool:
-        for key, value in self.params().items():
-            if key not in self.config:
-                self.messages.append(
-                    f"Parameter {key} has to be supplied for {self.treatment_type}"
-                )
-            if not isinstance(self.config[key], value):
-                self.messages.append(
-                    f"Parameter {key} has to be of type {value.__class__.__name__} for {self.treatment_type}"
-                )
-        for key in self.config:
-            if key == "duration":
-                if not validate_time_string(self.config[key]):
-                    self.messages.append(
-                        f"Value for parameter {key} has to match {time_string_format_regex} for {self.treatment_type}"
-                    )
-            if key == "loss_percentage":
-                format_regex = r"^[1-9][0-9]?\%$|^100\%$"
-                if not bool(re.match(format_regex, self.config[key])):
-                    self.messages.append(
-                        f"Value for parameter {key} has to match {format_regex} for {self.treatment_type}"
-                    )
+        for key in self.params():
+            if key not in config:
+                message(_MSG_MISSING.format_map({"key": key, "t": treatment_type}))
+                continue
+            value = config[key]
+            valid, pattern = checks.get(key, (None, None))
+            if valid and isinstance(value, str) and not valid(value):
+                message(_MSG_NO_MATCH.format_map({"key": key, "pattern": pattern, "t": treatment_type}))
         return not self.messages
 
-    def _transform_params(self) -> None:
+    def _transform_params(self, _t2s=time_string_to_seconds) -> None:
         if "duration" in self.config:
             relative_time_string = self.config.get("duration")
-            relative_time_seconds = time_string_to_seconds(relative_time_string)
+            relative_time_seconds = _t2s(relative_time_string)
             self.config |= {"duration_string": str(relative_time_seconds)}
             self.config |= {"duration_integer": relative_time_seconds}
 
     def preconditions(self) -> bool:
         """Check if the service has tc installed"""
         service = self.config.get("service_name")
-        command = ["tc", "-Version"]
         try:
-            container = self.client.containers.get(container_id=service)
-            status_code, _ = container.exec_run(cmd=command)
-            logger.info(f"Probed container {service} for tc with result {status_code}")
-            if not status_code == 0:
+            has_tc = _has_tc(_get_container(self))
+            if not has_tc:
                 self.messages.append(
                     f"Container {service} does not have tc installed which is required for {self}. Please install "
                     "package iptables2 in the container"
                 )
-            return status_code == 0
+            return has_tc
         except ContainerNotFound:
             logger.error(f"Can't find container {service}")
             return False
@@ -857,56 +1126,10 @@ class PacketLossTreatment(Treatment):
             return False
 
     def inject(self):
-        duration_seconds = self.config.get("duration_integer")
-        service = self.config.get("service_name")
-        percentage = self.config.get("loss_percentage")
-        interface = self.config.get("interface")
-        command = [
-            "tc",
-            "qdisc",
-            "add",
-            "dev",
-            interface,
-            "root",
-            "netem",
-            "loss",
-            "random",
-            percentage,
-        ]
-        try:
-            container = self.client.containers.get(container_id=service)
-            status_code, _ = container.exec_run(cmd=command)
-            logger.debug(
-                f"Injected packet loss into container {service} with status code {status_code}. Waiting for {duration_seconds}s"
-            )
-            time.sleep(duration_seconds)
-        except ContainerNotFound:
-            logger.error(f"Can't find container {service}")
-        except DockerAPIError as e:
-            logger.error(f"Docker API returned an error: {e.explanation}")
-
-    def clean(self):
-        interface = self.config.get("interface") or "eth0"
-        service = self.config.get("service_name")
-        command = [
-            "tc",
-            "qdisc",
-            "del",
-            "dev",
-            interface,
-            "root",
-            "netem",
-        ]
-        try:
-            container = self.client.containers.get(container_id=service)
-            container.exec_run(cmd=command)
-            logger.info(f"Cleaned packet loss treatment in container {service}.")
-            self.client.close()
-        except (DockerAPIError, ContainerNotFound) as e:
-            logger.error(
-                f"Cannot clean packet loss treatment from container {service}: {e.explanation}"
-            )
-            logger.error(f"Container state for {service} might be polluted now")
+        config = self.config
+        duration_seconds, percentage = config["duration_integer"], config["loss_percentage"]
+        netem_args = ["loss", "random", percentage]
+        self._inject_netem(netem_args, duration_seconds)
 
 
 class KillTreatment(Treatment):
@@ -916,12 +1139,15 @@ class KillTreatment(Treatment):
 
     action = "kill"
 
+    @property
+    def controls_lifecycle(self) -> bool:
+        return True
+
     def preconditions(self) -> bool:
         """Check if the docker daemon is running and the container is running"""
         service = self.config.get("service_name")
-        client = docker.from_env()
         try:
-            container = client.containers.get(container_id=service)
+            container = _get_container(self, reload=True)
             container_state = container.status
             logger.debug(
                 f"Probed container {service} for state running with result {container_state}"
@@ -941,14 +1167,13 @@ class KillTreatment(Treatment):
     def inject(self) -> None:
         service_name = self.config.get("service_name")
         duration_seconds = self.config.get("duration_seconds")
-        client = docker.from_env()
         try:
-            container = client.containers.get(container_id=service_name)
+            container = _get_container(self)
             container.kill()
             logger.debug(
                 f"Killed container {service_name}. Sleeping for {duration_seconds}"
             )
-            time.sleep(duration_seconds)
+            self._sleep(duration_seconds)
         except ContainerNotFound:
             logger.error(f"Can't find container {service_name}")
         except DockerAPIError as e:
@@ -956,37 +1181,36 @@ class KillTreatment(Treatment):
 
     def clean(self) -> None:
         service_name = self.config.get("service_name")
-        client = docker.from_env()
         try:
-            container = client.containers.get(container_id=service_name)
+            container = _get_container(self)
             container.restart()
+            # probe the restarted container again instead of trusting earlier results
+            invalidate_capability_cache(container.id)
             logger.debug(f"Restarted container {service_name}")
         except ContainerNotFound:
             logger.error(f"Can't find container {service_name}")
         except DockerAPIError as e:
             logger.error(f"Docker API returned an error: {e.explanation}")
 
+    PARAMS: ClassVar[dict] = {
+        "service_name": str,
+        "duration": str,
+    }
+
     def params(self) -> dict:
-        return {
-            "service_name": str,
-            "duration": str,
-        }
+        return self.PARAMS
 
     def _validate_params(self) -> bool:
-        for key, value in self.params().items():
-            if key == "service_name" and key not in self.config:
-                self.messages.append(
-                    f"Parameter {key} has to be supplied for {self.treatment_type}"
-                )
-            if key == "service_name" and not isinstance(self.config[key], value):
-                self.messages.append(
-                    f"Parameter {key} has to be of type {value} for {self.treatment_type}"
-                )
-        for key, value in self.config.items():
-            if key == "duration" and not validate_time_string(value):
-                self.messages.append(
-                    f"Parameter {key} has to match {time_string_format_regex} for {self.treatment_type}"
-                )
+        config = self.config
+        treatment_type = self.treatment_type
+        self._check_types()
+        if "service_name" not in config:
+            self.messages.append(_MSG_MISSING.format_map({"key": "service_name", "t": treatment_type}))
+        duration = config.get("duration")
+        if isinstance(duration, str) and not validate_time_string(duration):
+            self.messages.append(_MSG_NO_MATCH.format_map(
+                {"key": "duration", "pattern": time_string_format_regex, "t": treatment_type}
+            ))
         return not self.messages
 
     def _transform_params(self):
@@ -1038,54 +1262,49 @@ class PrometheusIntervalTreatment(Treatment):
         return True
 
     def inject(self) -> None:
-        prometheus_yaml = self.config.get("prometheus_yaml")
-        prometheus_yaml["global"]["scrape_interval"] = self.config.get("interval")
-        prometheus_path = self.config.get("prometheus_config")
-        with open(prometheus_path, "w+") as fp:
-            yaml.dump(prometheus_yaml, fp, default_flow_style=False)
-        # tell prometheus to reload the config
-        # TODO: infer the url from docker compose file or have it be user provided
-        requests.post("http://localhost:9090/-/reload")
+        self._write_and_reload(self.config.get("interval"))
 
     def clean(self) -> None:
+        current_interval = self.config["prometheus_yaml"]["global"]["scrape_interval"]
+        original_interval = self.config.get("original_interval")
+        # nothing to restore if inject did not change the interval, and a reload is expensive for prometheus
+        if current_interval == original_interval:
+            return
+        self._write_and_reload(original_interval)
+
+    def _write_and_reload(self, interval: str) -> None:
+        """Write the scrape interval to the prometheus config and tell prometheus to reload it"""
         prometheus_yaml = self.config.get("prometheus_yaml")
-        prometheus_yaml["global"]["scrape_interval"] = self.config.get(
-            "original_interval"
-        )
+        prometheus_yaml["global"]["scrape_interval"] = interval
         prometheus_path = self.config.get("prometheus_config")
-        with open(prometheus_path, "w+") as fp:
-            yaml.dump(prometheus_yaml, fp, default_flow_style=False)
-        # tell prometheus to reload the config
-        requests.post("http://localhost:9090/-/reload")
+        # the config is bind-mounted into the prometheus container, so it is rewritten in place
+        _write_in_place(prometheus_path, yaml.dump(prometheus_yaml, Dumper=_YDumper, default_flow_style=False))
+        # TODO: infer the url from docker compose file or have it be user provided
+        _PROM_SESSION.post("http://localhost:9090/-/reload")
+
+    PARAMS: ClassVar[dict] = {
+        "prometheus_config": str,
+        "interval": str,
+    }
 
     def params(self) -> dict:
-        return {
-            "prometheus_config": str,
-            "interval": str,
-        }
+        return self.PARAMS
 
     def _validate_params(self) -> bool:
-        for key, val in self.params().items():
-            if key in {"prometheus_config", "interval"} and key not in self.config:
-                self.messages.append(
-                    f"Parameter {key} has to be supplied for {self.treatment_type}"
-                )
-            if key in self.config and not isinstance(self.config[key], val):
-                self.messages.append(
-                    f"Parameter {key} has to be of type {val} for {self.treatment_type}"
-                )
-        for key, value in self.config.items():
-            prometheus_regex = (
-                r"((([0-9]+)y)?(([0-9]+)w)?(([0-9]+)d)?(([0-9]+)h)?(([0-9]+)m)?((["
-                r"0-9]+)s)?(([0-9]+)ms)?|0)"
-            )
-            if key == "interval" and not bool(re.match(prometheus_regex, value)):
-                self.messages.append(
-                    f"Parameter {key} has to match {prometheus_regex} for {self.treatment_type}"
-                )
-            if key == "prometheus_config":
-                if not os.path.isfile(value):
-                    self.messages.append(f"Prometheus config at {value} does not exist")
+        config = self.config
+        treatment_type = self.treatment_type
+        self._check_types()
+        for key in ("prometheus_config", "interval"):
+            if key not in config:
+                self.messages.append(_MSG_MISSING.format_map({"key": key, "t": treatment_type}))
+        interval = config.get("interval")
+        if isinstance(interval, str) and not _PROM_INTERVAL_RE.match(interval):
+            self.messages.append(_MSG_NO_MATCH.format_map(
+                {"key": "interval", "pattern": _PROM_INTERVAL_RE.pattern, "t": treatment_type}
+            ))
+        prometheus_config = config.get("prometheus_config")
+        if isinstance(prometheus_config, str) and not os.path.isfile(prometheus_config):
+            self.messages.append(_MSG_NOT_FOUND.format_map({"key": "prometheus_config", "kind": "file", "t": treatment_type}))
         return not self.messages
 
     def _transform_params(self) -> None:
@@ -1095,7 +1314,7 @@ class PrometheusIntervalTreatment(Treatment):
         # since _transform_params always get called after validation, we know the file exists
         path = self.config.get("prometheus_config")
         with open(path, "r") as fp:
-            self.config["prometheus_yaml"] = yaml.safe_load(fp.read())
+            self.config["prometheus_yaml"] = yaml.load(fp, Loader=_YLoader)
             self.config["original_interval"] = self.config["prometheus_yaml"]["global"][
                 "scrape_interval"
             ]
@@ -1118,19 +1337,13 @@ class StressTreatment(Treatment):
     def preconditions(self) -> bool:
         """Check if the service has stress-ng installed"""
         service = self.config.get("service_name")
-        command = ["stress-ng", "--version"]
-        client = docker.from_env()
         try:
-            container = client.containers.get(container_id=service)
-            status_code, _ = container.exec_run(cmd=command)
-            logger.debug(
-                f"Probed container {service} for stress-ng installation with result {status_code}"
-            )
-            if not status_code == 0:
+            has_stress_ng = _has_stress_ng(_get_container(self))
+            if not has_stress_ng:
                 self.messages.append(
                     f"Container {service} does not have stress-ng installed which is required for {self.treatment_type}."
                 )
-            return status_code == 0
+            return has_stress_ng
 
         except ContainerNotFound:
             logger.error(f"Can't find container {service}")
@@ -1140,7 +1353,7 @@ class StressTreatment(Treatment):
             return False
 
     def _build_stressor_list(self):
-        return list(sum(self.stressors.items(), ()))
+        return list(itertools.chain.from_iterable(self.stressors.items()))
 
     def _build_command(self):
         stressor_list = self._build_stressor_list()
@@ -1152,10 +1365,9 @@ class StressTreatment(Treatment):
         service_name = self.config.get("service_name")
 
         command = self._build_command()
-        client = docker.from_env()
 
         try:
-            container = client.containers.get(container_id=service_name)
+            container = _get_container(self)
             status_code, _ = container.exec_run(cmd=command)
             logger.debug(
                 f"Injected stress into container {service_name}. stress-ng terminated with status code {status_code}."
@@ -1169,35 +1381,29 @@ class StressTreatment(Treatment):
         # stress-ng cleans up after itself
         pass
 
+    PARAMS: ClassVar[dict] = {
+        "service_name": str,
+        "stressors": dict,
+        "duration": str,
+    }
+
     def params(self) -> dict:
-        return {
-            "service_name": str,
-            "stressors": dict,
-            "duration": str,
-        }
+        return self.PARAMS
 
     def _validate_params(self) -> bool:
-        for key, val in self.params().items():
-            if (
-                    key in {"service_name", "duration", "stressors"}
-                    and key not in self.config
-            ):
-                self.messages.append(
-                    f"Parameter {key} has to be supplied for {self.treatment_type}"
-                )
-            if key in self.config and not isinstance(self.config[key], val):
-                self.messages.append(
-                    f"Parameter {key} has to be of type {val.__class__.__name__} for {self.treatment_type}"
-                )
-        for key, value in self.config.items():
-            if key == "duration" and not validate_time_string(value):
-                self.messages.append(
-                    f"Parameter {key} has to match {time_string_format_regex} for {self.treatment_type}"
-                )
-            if key == "stressors" and not value:
-                self.messages.append(
-                    f"Parameter {key} has to have at least one stressor for {self.treatment_type}"
-                )
+        config = self.config
+        treatment_type = self.treatment_type
+        self._check_types()
+        for key in ("service_name", "duration", "stressors"):
+            if key not in config:
+                self.messages.append(_MSG_MISSING.format_map({"key": key, "t": treatment_type}))
+        duration = config.get("duration")
+        if isinstance(duration, str) and not validate_time_string(duration):
+            self.messages.append(_MSG_NO_MATCH.format_map(
+                {"key": "duration", "pattern": time_string_format_regex, "t": treatment_type}
+            ))
+        if "stressors" in config and not config["stressors"]:
+            self.messages.append(_MSG_EMPTY.format_map({"key": "stressors", "t": treatment_type}))
         return not self.messages
 
     def _transform_params(self) -> None:
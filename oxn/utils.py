@@ -1,5 +1,6 @@
 import os
 import re
+import time
 from typing import Callable
 from datetime import datetime
 from datetime import timezone
@@ -21,24 +22,45 @@ SECONDS_MAP = {
 """Map used to convert time strings to seconds"""
 
 time_string_format_regex = r"(\d+)(us|ms|s|m|h|d)"
+_TIME_RE = re.compile(time_string_format_regex)
+"""Compiled version of the time string format regex"""
 
 
+@functools.lru_cache(maxsize=1024)
 def validate_time_string(time_string):
     """
     Validate that a time string has units
 
     """
-    return bool(re.match(time_string_format_regex, time_string))
+    return bool(_TIME_RE.match(time_string))
 
 
+@functools.lru_cache(maxsize=1024)
 def time_string_to_seconds(time_string) -> float:
-    """Convert a time string with units to a float"""
-    matches = re.findall(time_string_format_regex, time_string)
+    """
+    Convert a time string with units to a float
+
+    The string is scanned once for runs of digits followed by a unit, characters in between are skipped.
+    This yields the same result as summing up all matches of the time string format regex.
+    """
     seconds = 0.0
-    for match in matches:
-        value_part = match[0]
-        unit_part = match[1]
-        seconds += float(value_part) * SECONDS_MAP[unit_part]
+    length = len(time_string)
+    i = 0
+    while i < length:
+        if not time_string[i].isdecimal():
+            i += 1
+            continue
+        start = i
+        while i < length and time_string[i].isdecimal():
+            i += 1
+        value = time_string[start:i]
+        unit = time_string[i:i + 2]
+        if unit not in ("us", "ms"):
+            unit = time_string[i:i + 1]
+            if unit not in SECONDS_MAP:
+                continue
+        seconds += float(value) * SECONDS_MAP[unit]
+        i += len(unit)
     return seconds
 
 
@@ -53,13 +75,13 @@ def to_microseconds(seconds):
 
 
 def utc_timestamp() -> float:
-    """Get the current time in """
-    return datetime.now(timezone.utc).timestamp()
+    """Get the current time in seconds since the unix epoch, which is utc by definition"""
+    return time.time()
 
 
 def humanize_utc_timestamp(timestamp):
-    """Return a human-readable version of a timestamp"""
-    return datetime.utcfromtimestamp(timestamp)
+    """Return a human-readable, utc-aware version of a timestamp"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
 
 
 def add_env_variable(compose_file_path, service_name, variable_name, variable_value):
@@ -74,23 +96,23 @@ def add_env_variable(compose_file_path, service_name, variable_name, variable_va
         compose_dict["services"][service_name]["environment"] = []
 
     environment = compose_dict["services"][service_name]["environment"]
-    exists = False
-    if isinstance(environment, list):
-        for idx, env_var in enumerate(environment):
-            if env_var.startswith(f"{variable_name}="):
-                environment[idx] = f"{variable_name}={variable_value}"
-                exists = True
-        if not exists:
-            environment.append(f"{variable_name}={variable_value}")
-    else:
+    if not isinstance(environment, list):
         raise OxnException(explanation="Environment field for %s is not a list" % service_name)
+    # key the entries by variable name so the lookup does not scan the list
+    env_map = {entry.partition("=")[0]: entry for entry in environment}
+    env_map[variable_name] = f"{variable_name}={variable_value}"
+    compose_dict["services"][service_name]["environment"] = list(env_map.values())
 
     with open(compose_file_path, "w") as file:
         yaml.safe_dump(compose_dict, file)
 
 
-def remove_env_variable(compose_file_path, service_name, variable_name, variable_value):
-    """Remove an environment variable from a service in a Docker Compose file"""
+def remove_env_variable(compose_file_path, service_name, variable_name, variable_value=None):
+    """
+    Remove an environment variable from a service in a Docker Compose file
+
+    The variable is removed by name, whatever its value. Removing a variable that is not set is a no-op.
+    """
     with open(compose_file_path, "r") as file:
         compose_dict = yaml.safe_load(file)
 
@@ -98,8 +120,12 @@ def remove_env_variable(compose_file_path, service_name, variable_name, variable
         raise OxnException(explanation=f"Service {service_name} not found in Docker Compose file")
 
     if "environment" in compose_dict["services"][service_name]:
-        idx = compose_dict["services"][service_name]["environment"].index(f"{variable_name}={variable_value}")
-        compose_dict["services"][service_name]["environment"].remove(idx)
+        environment = compose_dict["services"][service_name]["environment"]
+        if not isinstance(environment, list):
+            raise OxnException(explanation="Environment field for %s is not a list" % service_name)
+        env_map = {entry.partition("=")[0]: entry for entry in environment}
+        env_map.pop(variable_name, None)
+        compose_dict["services"][service_name]["environment"] = list(env_map.values())
 
     with open(compose_file_path, "w") as file:
         yaml.safe_dump(compose_dict, file)
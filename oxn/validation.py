@@ -1,12 +1,17 @@
 """Module to handle validation of experiment specifications"""
-from typing import Set, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Set, List, Tuple
 
 import schema
+from requests.adapters import DEFAULT_POOLSIZE
 
 from .errors import OxnException
 from .jaeger import Jaeger
 from .prometheus import Prometheus
 
+_METADATA_CACHE: dict = {}
+"""Metric names, label names, label values and service names keyed by Prometheus and Jaeger base urls"""
+
 
 class SemanticValidator:
     """Semantic validation for experiment specifications"""
@@ -32,14 +37,31 @@ class SemanticValidator:
         """Constant to represent the trace rvar type"""
         self.messages: List[str] = []
         """List of messages to pass to CLI in case of failing validation"""
+        self._load_metadata()
+        """Populate the metric, label and service name sets, reusing earlier results for the same backends"""
+
+    @property
+    def _metadata_key(self) -> Tuple[str, str]:
+        """Identify the backends the metadata was fetched from"""
+        return self.prometheus.base_url, self.jaeger.base_url
+
+    def _load_metadata(self) -> None:
+        """Populate the metadata sets from the cache, or from Prometheus and Jaeger if nothing is cached"""
+        cached = _METADATA_CACHE.get(self._metadata_key)
+        if cached is None:
+            self.refresh()
+            return
+        self.metric_names, self.label_names, self.label_values, self.service_names = cached
+
+    def refresh(self) -> None:
+        """Fetch the metadata from Prometheus and Jaeger again and update the cache"""
         self._populate_metrics()
-        """Populate the metric name set"""
         self._populate_labels()
-        """Populate the label name set"""
         self._populate_label_values()
-        """Populate the label value set"""
         self._populate_service_names()
-        """Populate the service name set """
+        _METADATA_CACHE[self._metadata_key] = (
+            self.metric_names, self.label_names, self.label_values, self.service_names
+        )
 
     def _populate_service_names(self) -> Set[str]:
         """Call jaeger to get a list of service names from Jaeger traces"""
@@ -63,11 +85,15 @@ class SemanticValidator:
 
     def _populate_label_values(self) -> dict[str, Set[str]]:
         """For a given label, get all legal label values"""
-        self.label_values = {}
-        for label in self.label_names:
-            prometheus_response = self.prometheus.label_values(label=label)
-            label_values = prometheus_response["data"]
-            self.label_values[label] = set(label_values)
+        labels = list(self.label_names)
+        # one request per label, so issue them concurrently instead of waiting for each round-trip.
+        # the prometheus session keeps at most DEFAULT_POOLSIZE connections, more workers would only open
+        # connections that the pool discards again
+        with ThreadPoolExecutor(max_workers=DEFAULT_POOLSIZE) as executor:
+            responses = executor.map(lambda label: self.prometheus.label_values(label=label), labels)
+            self.label_values = {
+                label: set(prometheus_response["data"]) for label, prometheus_response in zip(labels, responses)
+            }
         return self.label_values
 
     def _validate_metric_name(self, name: str) -> None: